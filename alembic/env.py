@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import re
 from logging.config import fileConfig
 
 from alembic import context
@@ -14,6 +15,18 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# Monthly conflict_history partitions are created at runtime by
+# app/history.py:ensure_history_partitions; autogenerate must not drop them
+_HISTORY_PARTITION_RE = re.compile(r"^conflict_history_y\d{4}m\d{2}$")
+
+
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    if type_ == "table":
+        return not _HISTORY_PARTITION_RE.match(name)
+    if type_ == "index":
+        return not _HISTORY_PARTITION_RE.match(obj.table.name)
+    return True
+
 
 def get_url() -> str:
     url = os.getenv("DATABASE_URL")
@@ -28,6 +41,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         compare_type=True,
+        include_object=include_object,
     )
     with context.begin_transaction():
         context.run_migrations()
@@ -48,6 +62,7 @@ def run_migrations_online() -> None:
             connection=connection,
             target_metadata=target_metadata,
             compare_type=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
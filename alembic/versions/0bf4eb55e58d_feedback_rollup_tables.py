@@ -0,0 +1,86 @@
+"""feedback rollup tables
+
+Revision ID: 0bf4eb55e58d
+Revises: e4a7b95c3d21
+Create Date: 2026-10-19 03:38:38.974879
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision = '0bf4eb55e58d'
+down_revision = 'e4a7b95c3d21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('feedback_admin1_stats',
+    sa.Column('conflict_data_id', sa.Integer(), nullable=False),
+    sa.Column('country_id', sa.Integer(), nullable=False),
+    sa.Column('feedback_count', sa.BigInteger(), nullable=False),
+    sa.Column('last_feedback_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['country_id'], ['countries.id'], ),
+    sa.PrimaryKeyConstraint('conflict_data_id')
+    )
+    op.create_index('ix_feedback_admin1_stats_count', 'feedback_admin1_stats', ['feedback_count'], unique=False)
+    op.create_index('ix_feedback_admin1_stats_country_count', 'feedback_admin1_stats', ['country_id', 'feedback_count'], unique=False)
+    op.create_table('feedback_admin1_weekly_stats',
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('conflict_data_id', sa.Integer(), nullable=False),
+    sa.Column('country_id', sa.Integer(), nullable=False),
+    sa.Column('feedback_count', sa.BigInteger(), nullable=False),
+    sa.Column('last_feedback_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['country_id'], ['countries.id'], ),
+    sa.PrimaryKeyConstraint('period_start', 'conflict_data_id')
+    )
+    op.create_index('ix_feedback_admin1_weekly_count', 'feedback_admin1_weekly_stats', ['period_start', 'feedback_count'], unique=False)
+    op.create_index('ix_feedback_admin1_weekly_country', 'feedback_admin1_weekly_stats', ['period_start', 'country_id', 'feedback_count'], unique=False)
+    op.create_table('feedback_country_stats',
+    sa.Column('country_id', sa.Integer(), nullable=False),
+    sa.Column('feedback_count', sa.BigInteger(), nullable=False),
+    sa.Column('last_feedback_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['country_id'], ['countries.id'], ),
+    sa.PrimaryKeyConstraint('country_id')
+    )
+    op.create_index('ix_feedback_country_stats_count', 'feedback_country_stats', ['feedback_count'], unique=False)
+
+    # Backfill from the existing feedback (weeks start on Monday, UTC)
+    op.execute(
+        """
+        INSERT INTO feedback_admin1_stats (conflict_data_id, country_id, feedback_count, last_feedback_at)
+        SELECT f.conflict_data_id, d.country_id, count(*), max(f.created_at)
+        FROM user_feedback f JOIN conflict_data d ON d.id = f.conflict_data_id
+        GROUP BY f.conflict_data_id, d.country_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO feedback_admin1_weekly_stats (period_start, conflict_data_id, country_id, feedback_count, last_feedback_at)
+        SELECT date_trunc('week', f.created_at AT TIME ZONE 'UTC')::date, f.conflict_data_id, d.country_id,
+               count(*), max(f.created_at)
+        FROM user_feedback f JOIN conflict_data d ON d.id = f.conflict_data_id
+        GROUP BY 1, f.conflict_data_id, d.country_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO feedback_country_stats (country_id, feedback_count, last_feedback_at)
+        SELECT country_id, sum(feedback_count), max(last_feedback_at)
+        FROM feedback_admin1_stats
+        GROUP BY country_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_feedback_country_stats_count', table_name='feedback_country_stats')
+    op.drop_table('feedback_country_stats')
+    op.drop_index('ix_feedback_admin1_weekly_country', table_name='feedback_admin1_weekly_stats')
+    op.drop_index('ix_feedback_admin1_weekly_count', table_name='feedback_admin1_weekly_stats')
+    op.drop_table('feedback_admin1_weekly_stats')
+    op.drop_index('ix_feedback_admin1_stats_country_count', table_name='feedback_admin1_stats')
+    op.drop_index('ix_feedback_admin1_stats_count', table_name='feedback_admin1_stats')
+    op.drop_table('feedback_admin1_stats')
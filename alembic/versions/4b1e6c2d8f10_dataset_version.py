@@ -0,0 +1,30 @@
+"""dataset version counter
+
+Revision ID: 4b1e6c2d8f10
+Revises: 9730ec3a47a9
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision = '4b1e6c2d8f10'
+down_revision = '9730ec3a47a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('dataset_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO dataset_version (id, version) VALUES (1, 1)")
+
+
+def downgrade() -> None:
+    op.drop_table('dataset_version')
@@ -0,0 +1,74 @@
+"""partitioned conflict history and windowed risk scores
+
+Revision ID: 7c3f9a21d5e4
+Revises: 4b1e6c2d8f10
+Create Date: 2026-10-19 15:40:02.512931
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision = '7c3f9a21d5e4'
+down_revision = '4b1e6c2d8f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows predate periods; file them under the week of the migration
+    op.add_column('conflict_data', sa.Column('period_start', sa.Date(), server_default=sa.text("date_trunc('week', now())::date"), nullable=False))
+    op.alter_column('conflict_data', 'period_start', server_default=None)
+
+    op.create_table('conflict_history',
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('country_norm', sa.String(length=50), nullable=False),
+    sa.Column('admin1_norm', sa.String(length=50), nullable=False),
+    sa.Column('country_raw', sa.String(length=50), nullable=False),
+    sa.Column('admin1_raw', sa.String(length=50), nullable=False),
+    sa.Column('population', sa.BigInteger(), nullable=True),
+    sa.Column('events', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Numeric(precision=12, scale=4), nullable=False),
+    sa.CheckConstraint('events >= 0', name='ck_conflict_history_events_nonneg'),
+    sa.PrimaryKeyConstraint('period_start', 'country_norm', 'admin1_norm'),
+    postgresql_partition_by='RANGE (period_start)'
+    )
+    op.create_index('ix_conflict_history_country_period', 'conflict_history', ['country_norm', 'period_start'], unique=False)
+
+    # Monthly partitions for the backfill; the importer creates later ones (app.history)
+    op.execute("""
+        DO $$
+        DECLARE m date;
+        BEGIN
+            FOR m IN SELECT DISTINCT date_trunc('month', period_start)::date FROM conflict_data LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF conflict_history FOR VALUES FROM (%L) TO (%L)',
+                    'conflict_history_y' || to_char(m, 'YYYY') || 'm' || to_char(m, 'MM'),
+                    m, (m + interval '1 month')::date
+                );
+            END LOOP;
+        END $$;
+    """)
+    op.execute("""
+        INSERT INTO conflict_history
+            (period_start, country_norm, admin1_norm, country_raw, admin1_raw, population, events, score)
+        SELECT period_start, country_norm, admin1_norm, country_raw, admin1_raw, population, events, score
+        FROM conflict_data
+    """)
+
+    op.add_column('risk_score_cache', sa.Column('window_weeks', sa.Integer(), server_default='0', nullable=False))
+    op.drop_constraint('uq_risk_country_norm', 'risk_score_cache', type_='unique')
+    op.create_unique_constraint('uq_risk_country_window', 'risk_score_cache', ['country_norm', 'window_weeks'])
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM risk_score_cache WHERE window_weeks <> 0")
+    op.drop_constraint('uq_risk_country_window', 'risk_score_cache', type_='unique')
+    op.create_unique_constraint('uq_risk_country_norm', 'risk_score_cache', ['country_norm'])
+    op.drop_column('risk_score_cache', 'window_weeks')
+
+    # Dropping the parent drops its partitions
+    op.drop_index('ix_conflict_history_country_period', table_name='conflict_history')
+    op.drop_table('conflict_history')
+    op.drop_column('conflict_data', 'period_start')
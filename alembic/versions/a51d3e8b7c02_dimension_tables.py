@@ -0,0 +1,201 @@
+"""country/admin1 dimension tables; facts keyed by integer ids
+
+Revision ID: a51d3e8b7c02
+Revises: 7c3f9a21d5e4
+Create Date: 2026-10-19 17:05:31.904412
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision = 'a51d3e8b7c02'
+down_revision = '7c3f9a21d5e4'
+branch_labels = None
+depends_on = None
+
+
+def _rename_partitions(parent: str, suffix: str) -> None:
+    op.execute(f"""
+        DO $$
+        DECLARE child text;
+        BEGIN
+            FOR child IN SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                         WHERE i.inhparent = '{parent}'::regclass LOOP
+                EXECUTE format('ALTER TABLE %I RENAME TO %I', child, child || '{suffix}');
+            END LOOP;
+        END $$;
+    """)
+
+
+def upgrade() -> None:
+    op.create_table('countries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name_norm', sa.String(length=50), nullable=False),
+    sa.Column('name_raw', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name_norm')
+    )
+    op.create_table('admin1_regions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('country_id', sa.Integer(), nullable=False),
+    sa.Column('name_norm', sa.String(length=50), nullable=False),
+    sa.Column('name_raw', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['country_id'], ['countries.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('country_id', 'name_norm', name='uq_admin1_country_name_norm')
+    )
+
+    # Display name = smallest raw spelling (what min(country_raw) used to return);
+    # admin1 keeps the spelling of its newest observation
+    op.execute("""
+        INSERT INTO countries (name_norm, name_raw)
+        SELECT country_norm, min(country_raw)
+        FROM (
+            SELECT country_norm, country_raw FROM conflict_data
+            UNION ALL
+            SELECT country_norm, country_raw FROM conflict_history
+        ) s
+        GROUP BY country_norm
+    """)
+    op.execute("""
+        INSERT INTO admin1_regions (country_id, name_norm, name_raw)
+        SELECT DISTINCT ON (c.id, s.admin1_norm) c.id, s.admin1_norm, s.admin1_raw
+        FROM (
+            SELECT country_norm, admin1_norm, admin1_raw, period_start FROM conflict_data
+            UNION ALL
+            SELECT country_norm, admin1_norm, admin1_raw, period_start FROM conflict_history
+        ) s
+        JOIN countries c ON c.name_norm = s.country_norm
+        ORDER BY c.id, s.admin1_norm, s.period_start DESC
+    """)
+
+    # conflict_data: rebuilt rather than altered, so the dropped strings don't keep
+    # taking space until a VACUUM FULL. Ids are kept for user_feedback.
+    op.drop_constraint('user_feedback_conflict_data_id_fkey', 'user_feedback', type_='foreignkey')
+    op.rename_table('conflict_data', 'conflict_data_old')
+    op.execute("ALTER TABLE conflict_data_old RENAME CONSTRAINT conflict_data_pkey TO conflict_data_old_pkey")
+    op.execute("ALTER SEQUENCE conflict_data_id_seq RENAME TO conflict_data_old_id_seq")
+
+    op.create_table('conflict_data',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('country_id', sa.Integer(), nullable=False),
+    sa.Column('admin1_id', sa.Integer(), nullable=False),
+    sa.Column('population', sa.BigInteger(), nullable=True),
+    sa.Column('events', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Numeric(precision=12, scale=4), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.CheckConstraint('events >= 0', name='ck_conflict_events_nonneg'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("""
+        INSERT INTO conflict_data (id, country_id, admin1_id, population, events, score, period_start)
+        SELECT o.id, a.country_id, a.id, o.population, o.events, o.score, o.period_start
+        FROM conflict_data_old o
+        JOIN countries c ON c.name_norm = o.country_norm
+        JOIN admin1_regions a ON a.country_id = c.id AND a.name_norm = o.admin1_norm
+    """)
+    op.execute("SELECT setval('conflict_data_id_seq', coalesce((SELECT max(id) FROM conflict_data), 0) + 1, false)")
+    # Indexes after the load: one sort per index instead of row-by-row inserts
+    op.create_unique_constraint('conflict_data_admin1_id_key', 'conflict_data', ['admin1_id'])
+    op.create_index(op.f('ix_conflict_data_country_id'), 'conflict_data', ['country_id'], unique=False)
+    op.create_foreign_key('conflict_data_country_id_fkey', 'conflict_data', 'countries', ['country_id'], ['id'])
+    op.create_foreign_key('conflict_data_admin1_id_fkey', 'conflict_data', 'admin1_regions', ['admin1_id'], ['id'])
+    op.drop_table('conflict_data_old')
+    op.create_foreign_key(
+        'user_feedback_conflict_data_id_fkey', 'user_feedback', 'conflict_data', ['conflict_data_id'], ['id'], ondelete='CASCADE'
+    )
+
+    # conflict_history: same rebuild, partition by partition
+    _rename_partitions('conflict_history', '_old')
+    op.rename_table('conflict_history', 'conflict_history_old')
+    op.execute("ALTER TABLE conflict_history_old RENAME CONSTRAINT conflict_history_pkey TO conflict_history_old_pkey")
+    op.execute("ALTER INDEX ix_conflict_history_country_period RENAME TO ix_conflict_history_old_country_period")
+
+    op.create_table('conflict_history',
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('admin1_id', sa.Integer(), nullable=False),
+    sa.Column('country_id', sa.Integer(), nullable=False),
+    sa.Column('population', sa.BigInteger(), nullable=True),
+    sa.Column('events', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Numeric(precision=12, scale=4), nullable=False),
+    sa.CheckConstraint('events >= 0', name='ck_conflict_history_events_nonneg'),
+    postgresql_partition_by='RANGE (period_start)'
+    )
+    op.execute("""
+        DO $$
+        DECLARE m date;
+        BEGIN
+            FOR m IN SELECT DISTINCT date_trunc('month', period_start)::date FROM conflict_history_old LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF conflict_history FOR VALUES FROM (%L) TO (%L)',
+                    'conflict_history_y' || to_char(m, 'YYYY') || 'm' || to_char(m, 'MM'),
+                    m, (m + interval '1 month')::date
+                );
+            END LOOP;
+        END $$;
+    """)
+    op.execute("""
+        INSERT INTO conflict_history (period_start, admin1_id, country_id, population, events, score)
+        SELECT o.period_start, a.id, a.country_id, o.population, o.events, o.score
+        FROM conflict_history_old o
+        JOIN countries c ON c.name_norm = o.country_norm
+        JOIN admin1_regions a ON a.country_id = c.id AND a.name_norm = o.admin1_norm
+    """)
+    op.create_primary_key('conflict_history_pkey', 'conflict_history', ['period_start', 'admin1_id'])
+    op.create_index('ix_conflict_history_country_period', 'conflict_history', ['country_id', 'period_start'], unique=False)
+    op.create_foreign_key('conflict_history_admin1_id_fkey', 'conflict_history', 'admin1_regions', ['admin1_id'], ['id'])
+    op.create_foreign_key('conflict_history_country_id_fkey', 'conflict_history', 'countries', ['country_id'], ['id'])
+    # Dropping the parent drops its partitions
+    op.drop_table('conflict_history_old')
+
+    # risk_score_cache is small; alter in place. Rows for countries without data go.
+    op.add_column('risk_score_cache', sa.Column('country_id', sa.Integer(), nullable=True))
+    op.execute("UPDATE risk_score_cache r SET country_id = c.id FROM countries c WHERE c.name_norm = r.country_norm")
+    op.execute("DELETE FROM risk_score_cache WHERE country_id IS NULL")
+    op.alter_column('risk_score_cache', 'country_id', nullable=False)
+    op.drop_constraint('uq_risk_country_window', 'risk_score_cache', type_='unique')
+    op.drop_column('risk_score_cache', 'country_norm')
+    op.create_unique_constraint('uq_risk_country_window', 'risk_score_cache', ['country_id', 'window_weeks'])
+    op.create_foreign_key('risk_score_cache_country_id_fkey', 'risk_score_cache', 'countries', ['country_id'], ['id'])
+
+
+def downgrade() -> None:
+    op.add_column('risk_score_cache', sa.Column('country_norm', sa.String(length=50), nullable=True))
+    op.execute("UPDATE risk_score_cache r SET country_norm = c.name_norm FROM countries c WHERE c.id = r.country_id")
+    op.alter_column('risk_score_cache', 'country_norm', nullable=False)
+    op.drop_constraint('uq_risk_country_window', 'risk_score_cache', type_='unique')
+    op.drop_column('risk_score_cache', 'country_id')
+    op.create_unique_constraint('uq_risk_country_window', 'risk_score_cache', ['country_norm', 'window_weeks'])
+
+    # Downgrades alter in place (no rebuild)
+    for table in ('conflict_data', 'conflict_history'):
+        for col in ('country_raw', 'country_norm', 'admin1_raw', 'admin1_norm'):
+            op.add_column(table, sa.Column(col, sa.String(length=50), nullable=True))
+        op.execute(f"""
+            UPDATE {table} t
+            SET country_raw = c.name_raw, country_norm = c.name_norm,
+                admin1_raw = a.name_raw, admin1_norm = a.name_norm
+            FROM admin1_regions a JOIN countries c ON c.id = a.country_id
+            WHERE a.id = t.admin1_id
+        """)
+        for col in ('country_raw', 'country_norm', 'admin1_raw', 'admin1_norm'):
+            op.alter_column(table, col, nullable=False)
+
+    op.drop_constraint('conflict_history_pkey', 'conflict_history', type_='primary')
+    op.drop_index('ix_conflict_history_country_period', table_name='conflict_history')
+    op.drop_column('conflict_history', 'admin1_id')
+    op.drop_column('conflict_history', 'country_id')
+    op.create_primary_key('conflict_history_pkey', 'conflict_history', ['period_start', 'country_norm', 'admin1_norm'])
+    op.create_index('ix_conflict_history_country_period', 'conflict_history', ['country_norm', 'period_start'], unique=False)
+
+    op.drop_index(op.f('ix_conflict_data_country_id'), table_name='conflict_data')
+    op.drop_column('conflict_data', 'admin1_id')
+    op.drop_column('conflict_data', 'country_id')
+    op.create_unique_constraint('uq_conflict_country_admin1_norm', 'conflict_data', ['country_norm', 'admin1_norm'])
+    op.create_index(op.f('ix_conflict_data_admin1_norm'), 'conflict_data', ['admin1_norm'], unique=False)
+    op.create_index(op.f('ix_conflict_data_country_norm'), 'conflict_data', ['country_norm'], unique=False)
+
+    op.drop_table('admin1_regions')
+    op.drop_table('countries')
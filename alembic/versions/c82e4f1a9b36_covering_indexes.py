@@ -0,0 +1,44 @@
+"""covering indexes for index-only scans on hot queries
+
+Revision ID: c82e4f1a9b36
+Revises: a51d3e8b7c02
+Create Date: 2026-10-19 18:22:47.301559
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision = 'c82e4f1a9b36'
+down_revision = 'a51d3e8b7c02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Supersedes the plain country_id index
+    op.create_index('ix_conflict_data_country_cover', 'conflict_data', ['country_id'], unique=False, postgresql_include=['admin1_id', 'population', 'events', 'score'])
+    op.drop_index('ix_conflict_data_country_id', table_name='conflict_data')
+    op.drop_constraint('conflict_data_admin1_id_key', 'conflict_data', type_='unique')
+    op.create_index('conflict_data_admin1_id_key', 'conflict_data', ['admin1_id'], unique=True, postgresql_include=['country_id', 'population', 'events', 'score'])
+
+    # Same key and name, now a covering unique index (ON CONFLICT infers it from the columns)
+    op.drop_constraint('uq_admin1_country_name_norm', 'admin1_regions', type_='unique')
+    op.create_index('uq_admin1_country_name_norm', 'admin1_regions', ['country_id', 'name_norm'], unique=True, postgresql_include=['id', 'name_raw'])
+
+    op.drop_index('ix_conflict_history_country_period', table_name='conflict_history')
+    op.create_index('ix_conflict_history_country_period', 'conflict_history', ['country_id', 'period_start'], unique=False, postgresql_include=['admin1_id', 'population', 'events', 'score'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_conflict_history_country_period', table_name='conflict_history')
+    op.create_index('ix_conflict_history_country_period', 'conflict_history', ['country_id', 'period_start'], unique=False)
+
+    op.drop_index('uq_admin1_country_name_norm', table_name='admin1_regions')
+    op.create_unique_constraint('uq_admin1_country_name_norm', 'admin1_regions', ['country_id', 'name_norm'])
+
+    op.drop_index('conflict_data_admin1_id_key', table_name='conflict_data')
+    op.create_unique_constraint('conflict_data_admin1_id_key', 'conflict_data', ['admin1_id'])
+    op.create_index(op.f('ix_conflict_data_country_id'), 'conflict_data', ['country_id'], unique=False)
+    op.drop_index('ix_conflict_data_country_cover', table_name='conflict_data')
@@ -0,0 +1,43 @@
+"""admin1_regions keeps the week and country spelling of its display name
+
+Revision ID: c85c78182d77
+Revises: f19c2e7a4b58
+Create Date: 2026-10-19 03:49:00.778316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision = 'c85c78182d77'
+down_revision = 'f19c2e7a4b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('admin1_regions', sa.Column('country_name_raw', sa.String(length=50), nullable=True))
+    op.add_column('admin1_regions', sa.Column('name_period_start', sa.Date(), nullable=True))
+    # Until now the names came from the newest week imported, which is what
+    # conflict_data holds; regions without current data fall back to their history
+    op.execute(
+        """
+        UPDATE admin1_regions ar
+        SET country_name_raw = c.name_raw,
+            name_period_start = coalesce(
+                (SELECT d.period_start FROM conflict_data d WHERE d.admin1_id = ar.id),
+                (SELECT max(h.period_start) FROM conflict_history h WHERE h.admin1_id = ar.id),
+                DATE '1970-01-01'
+            )
+        FROM countries c
+        WHERE c.id = ar.country_id
+        """
+    )
+    op.alter_column('admin1_regions', 'country_name_raw', nullable=False)
+    op.alter_column('admin1_regions', 'name_period_start', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('admin1_regions', 'name_period_start')
+    op.drop_column('admin1_regions', 'country_name_raw')
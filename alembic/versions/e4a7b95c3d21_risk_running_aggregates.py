@@ -0,0 +1,53 @@
+"""running score_sum/row_count aggregates for the current risk score
+
+Revision ID: e4a7b95c3d21
+Revises: c82e4f1a9b36
+Create Date: 2026-10-19 20:41:12.518304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision = 'e4a7b95c3d21'
+down_revision = 'c82e4f1a9b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('risk_score_cache', sa.Column('score_sum', sa.Numeric(precision=20, scale=4), nullable=True))
+    op.add_column('risk_score_cache', sa.Column('row_count', sa.BigInteger(), nullable=True))
+
+    # Backfill: every country with current data gets a ready window-0 row
+    op.execute(
+        """
+        INSERT INTO risk_score_cache (country_id, window_weeks, status)
+        SELECT DISTINCT country_id, 0, 'stale' FROM conflict_data
+        ON CONFLICT (country_id, window_weeks) DO NOTHING
+        """
+    )
+    op.execute(
+        """
+        UPDATE risk_score_cache r
+        SET score_sum = coalesce(a.score_sum, 0),
+            row_count = coalesce(a.row_count, 0),
+            score = CASE WHEN a.row_count > 0 THEN a.score_sum / a.row_count END,
+            status = CASE WHEN a.row_count > 0 THEN 'ready' ELSE 'failed' END,
+            last_error = CASE WHEN a.row_count > 0 THEN NULL ELSE 'no rows for country' END,
+            computed_at = now()
+        FROM risk_score_cache c
+        LEFT JOIN (
+            SELECT country_id, sum(score) AS score_sum, count(*) AS row_count
+            FROM conflict_data
+            GROUP BY country_id
+        ) a ON a.country_id = c.country_id
+        WHERE r.id = c.id AND c.window_weeks = 0
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('risk_score_cache', 'row_count')
+    op.drop_column('risk_score_cache', 'score_sum')
@@ -0,0 +1,24 @@
+"""risk_score_cache.generation guards job results against concurrent invalidation
+
+Revision ID: f19c2e7a4b58
+Revises: 0bf4eb55e58d
+Create Date: 2026-10-19 21:12:05.240917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision = 'f19c2e7a4b58'
+down_revision = '0bf4eb55e58d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('risk_score_cache', sa.Column('generation', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('risk_score_cache', 'generation')
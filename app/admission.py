@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from starlette.routing import Match
+
+from app.auth.jwt import TokenError, decode_token
+from app.core.config import settings
+
+log = logging.getLogger("app.admission")
+
+# Cheap probes must keep answering under load
+EXEMPT_PATHS = frozenset({"/health", "/ready", "/metrics"})
+
+# Idle buckets are dropped after this many seconds (they'd be full again anyway)
+_BUCKET_IDLE_SECONDS = 300
+_PRUNE_EVERY_REQUESTS = 10_000
+
+
+def parse_concurrency_limits(raw: str) -> dict[str, int]:
+    """
+    "POST /login=8, GET /conflictdata=32" -> {"POST /login": 8, "GET /conflictdata": 32}.
+    Paths are route templates as declared in app/main.py.
+    """
+    limits: dict[str, int] = {}
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        key, _, value = item.rpartition("=")
+        method, _, path = key.strip().partition(" ")
+        limits[f"{method.upper()} {path.strip()}"] = int(value)
+    return limits
+
+
+@dataclass
+class _Bucket:
+    tokens: float
+    updated_at: float
+
+
+class TokenBuckets:
+    """Per-identity token buckets. Only touched from the event loop thread, so no locking."""
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._buckets: dict[str, _Bucket] = {}
+        self._calls = 0
+
+    def take(self, identity: str) -> Optional[float]:
+        """Consumes one token. Returns None if allowed, else seconds until a token is available."""
+        now = time.monotonic()
+        b = self._buckets.get(identity)
+        if b is None:
+            b = self._buckets[identity] = _Bucket(tokens=self.burst, updated_at=now)
+        else:
+            b.tokens = min(self.burst, b.tokens + (now - b.updated_at) * self.rate)
+            b.updated_at = now
+
+        self._calls += 1
+        if self._calls % _PRUNE_EVERY_REQUESTS == 0:
+            self._prune(now)
+
+        if b.tokens >= 1:
+            b.tokens -= 1
+            return None
+        return (1 - b.tokens) / self.rate
+
+    def _prune(self, now: float) -> None:
+        stale = [k for k, b in self._buckets.items() if now - b.updated_at > _BUCKET_IDLE_SECONDS]
+        for k in stale:
+            del self._buckets[k]
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for k, v in scope.get("headers", ()):
+        if k == name:
+            return v.decode("latin-1")
+    return None
+
+
+def _identity(scope) -> str:
+    auth = _header(scope, b"authorization")
+    if auth and auth[:7].lower() == "bearer ":
+        try:
+            # Verified, so a forged sub can't drain someone else's bucket
+            sub = decode_token(auth[7:].strip()).get("sub")
+            if sub:
+                return f"user:{sub}"
+        except TokenError:
+            pass
+    # The real client behind a trusted proxy: uvicorn's proxy headers support
+    # (FORWARDED_ALLOW_IPS) has already rewritten scope["client"]
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+async def _reject(send, status_code: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionControlMiddleware:
+    """
+    Fails fast instead of queueing:
+    * per-route concurrency caps (ADMISSION_CONCURRENCY_LIMITS) -> 503 + Retry-After
+    * per-user token buckets (RATE_LIMIT_PER_SECOND / RATE_LIMIT_BURST; anonymous
+      callers are keyed by client IP) -> 429 + Retry-After
+    State is per process, so with N workers the effective node limits are N times higher.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.limits = parse_concurrency_limits(settings.ADMISSION_CONCURRENCY_LIMITS)
+        self.in_flight: dict[str, int] = {}
+        self.buckets = (
+            TokenBuckets(settings.RATE_LIMIT_PER_SECOND, settings.RATE_LIMIT_BURST)
+            if settings.RATE_LIMIT_PER_SECOND > 0
+            else None
+        )
+
+    def _match_route(self, scope):
+        for route in scope["app"].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route
+        return None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        route = self._match_route(scope)
+        if route is not None:
+            # Lets the metrics middleware label rejections with their route
+            scope["route"] = route
+
+        if self.buckets is not None:
+            wait = self.buckets.take(_identity(scope))
+            if wait is not None:
+                await _reject(send, 429, "rate limit exceeded", wait)
+                return
+
+        key = f"{scope['method']} {route.path}" if route is not None else None
+        limit = self.limits.get(key) if key is not None else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.in_flight.get(key, 0) >= limit:
+            log.warning("admission_rejected", extra={"route": key, "limit": limit})
+            await _reject(send, 503, "server busy, retry later", 1)
+            return
+
+        self.in_flight[key] = self.in_flight.get(key, 0) + 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight[key] -= 1
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from app.db import engine
+
+log = logging.getLogger("app.locks")
+
+# Cluster-wide advisory lock keys. Keep them unique across the schema.
+LOCK_STARTUP = 741_001
+LOCK_MAINTENANCE = 741_002
+
+# Namespace for per-job risk compute locks (two-int form: namespace, risk_compute_lock_key(...))
+LOCK_NS_RISK_COMPUTE = 741_100
+
+
+def risk_compute_lock_key(country_norm, window_weeks):
+    """
+    SQL expression for the second lock int. Takes literals or columns, so the
+    job and the orphaned-job reset compute the same key.
+    """
+    return func.hashtext(func.concat(country_norm, ":", window_weeks))
+
+
+@contextmanager
+def advisory_lock(key: int, *, wait: bool) -> Iterator[bool]:
+    """
+    Session-level advisory lock on a dedicated connection, held for the block.
+    Yields whether it was acquired (always True with wait=True). The lock is
+    also released if this process dies, since Postgres drops it with the
+    connection.
+    """
+    conn = engine.connect()
+    try:
+        if wait:
+            conn.execute(text("SELECT pg_advisory_lock(:k)"), {"k": key})
+            acquired = True
+        else:
+            acquired = bool(conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": key}).scalar_one())
+        # Session-level locks outlive the transaction; end it so the connection isn't idle-in-transaction
+        conn.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                try:
+                    conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": key})
+                    conn.commit()
+                except Exception:
+                    # Never return a connection that might still hold the lock to the pool
+                    log.exception("advisory unlock failed", extra={"lock_key": key})
+                    conn.invalidate()
+    finally:
+        conn.close()
+
+
+def lock_risk_compute(db: Session, country_id, window_weeks: int = 0) -> None:
+    """
+    Transaction-level lock marking a live compute job for (country, window_weeks).
+    country_id may be an id or a scalar subquery resolving one.
+    Waits while another job holds it: that job may have read the data before a
+    change that re-enqueued this one, so this one must still run afterwards.
+    Released by the commit that stores the result (or by rollback/disconnect).
+    """
+    db.execute(
+        select(func.pg_advisory_xact_lock(LOCK_NS_RISK_COMPUTE, risk_compute_lock_key(country_id, window_weeks)))
+    )
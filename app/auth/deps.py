@@ -6,8 +6,9 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.auth.jwt import TokenError, decode_token
-from app.db import get_db
+from app.db import get_db, get_read_db
 from app.models import User
+from app.tracing import trace_phase
 
 bearer = HTTPBearer(auto_error=False)
 
@@ -16,6 +17,22 @@ def get_current_user(
     creds: HTTPAuthorizationCredentials | None = Depends(bearer),
     db: Session = Depends(get_db),
 ) -> User:
+    # Timed as the request's "auth" phase (token check + user lookup)
+    with trace_phase("auth"):
+        return _authenticate(creds, db)
+
+
+def get_current_read_user(
+    creds: HTTPAuthorizationCredentials | None = Depends(bearer),
+    db: Session = Depends(get_read_db),
+) -> User:
+    # For routes on get_read_db: the lookup shares the request's one session
+    # (and pooled connection) instead of checking out a second one
+    with trace_phase("auth"):
+        return _authenticate(creds, db)
+
+
+def _authenticate(creds: HTTPAuthorizationCredentials | None, db: Session) -> User:
     if creds is None or creds.scheme.lower() != "bearer":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="missing token")
 
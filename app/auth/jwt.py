@@ -3,16 +3,19 @@ from __future__ import annotations
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from jose import JWTError, jwt
-
 from app.core.config import settings
 
+# jose (and its crypto backends) is imported inside the functions so it stays
+# off the process start path; after the first call the import is a dict lookup.
+
 
 class TokenError(Exception):
     pass
 
 
 def create_access_token(*, sub: str, role: str) -> str:
+    from jose import jwt
+
     now = datetime.now(timezone.utc)
     exp = now + timedelta(minutes=settings.JWT_EXPIRE_MINUTES)
 
@@ -26,6 +29,8 @@ def create_access_token(*, sub: str, role: str) -> str:
 
 
 def decode_token(token: str) -> dict[str, Any]:
+    from jose import JWTError, jwt
+
     try:
         return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
     except JWTError as e:
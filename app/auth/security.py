@@ -1,7 +1,14 @@
 import hashlib
-from passlib.context import CryptContext
+from functools import lru_cache
 
-_pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache(maxsize=1)
+def _pwd():
+    # passlib + bcrypt are only needed once someone logs in or registers; importing
+    # them lazily keeps them out of the process start path.
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def _bcrypt_safe_secret(password: str) -> str:
@@ -13,8 +20,8 @@ def _bcrypt_safe_secret(password: str) -> str:
 
 
 def hash_password(password: str) -> str:
-    return _pwd.hash(_bcrypt_safe_secret(password))
+    return _pwd().hash(_bcrypt_safe_secret(password))
 
 
 def verify_password(password: str, password_hash: str) -> bool:
-    return _pwd.verify(_bcrypt_safe_secret(password), password_hash)
+    return _pwd().verify(_bcrypt_safe_secret(password), password_hash)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db import ReadSessionLocal
+from app.models import Admin1Region, ConflictData, Country
+
+log = logging.getLogger("app.export")
+
+# Rows fetched per round trip from the server-side cursor. Also the unit in
+# which chunks are written to the client, so memory stays bounded by this.
+EXPORT_BATCH_ROWS = 2000
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+CSV_HEADER = ("country", "admin1", "population", "events", "score")
+
+
+def _export_query(country_norm: Optional[str]):
+    q = (
+        select(
+            Country.name_raw.label("country_raw"),
+            Admin1Region.name_raw.label("admin1_raw"),
+            ConflictData.population,
+            ConflictData.events,
+            ConflictData.score,
+        )
+        .select_from(ConflictData)
+        .join(Country, Country.id == ConflictData.country_id)
+        .join(Admin1Region, Admin1Region.id == ConflictData.admin1_id)
+    )
+    if country_norm is not None:
+        q = q.where(Country.name_norm == country_norm)
+    return q.order_by(Country.name_norm.asc(), Admin1Region.name_norm.asc())
+
+
+def iter_conflictdata_batches(db: Session, country_norm: Optional[str]) -> Iterator[list]:
+    """
+    Yields lists of (country_raw, admin1_raw, population, events, score) rows.
+    yield_per turns on stream_results, so psycopg uses a named (server-side)
+    cursor and only EXPORT_BATCH_ROWS rows are held in memory at a time.
+    """
+    result = db.execute(
+        _export_query(country_norm).execution_options(yield_per=EXPORT_BATCH_ROWS)
+    )
+    try:
+        for batch in result.partitions():
+            yield batch
+    finally:
+        result.close()
+
+
+def _csv_chunks(batches: Iterator[list]) -> Iterator[str]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(CSV_HEADER)
+    yield buf.getvalue()
+
+    for batch in batches:
+        buf.seek(0)
+        buf.truncate()
+        for country_raw, admin1_raw, population, events, score in batch:
+            writer.writerow(
+                (country_raw, admin1_raw, "" if population is None else population, events, score)
+            )
+        yield buf.getvalue()
+
+
+def _ndjson_chunks(batches: Iterator[list]) -> Iterator[str]:
+    for batch in batches:
+        # Field names/shape match ConflictRowOut (+ country_raw); score stays a
+        # string like the JSON endpoints so no precision is lost.
+        yield "".join(
+            json.dumps(
+                {
+                    "country_raw": country_raw,
+                    "admin1_raw": admin1_raw,
+                    "population": population,
+                    "events": events,
+                    "score": str(score),
+                },
+                separators=(",", ":"),
+            )
+            + "\n"
+            for country_raw, admin1_raw, population, events, score in batch
+        )
+
+
+def stream_conflictdata_export(fmt: str, country_norm: Optional[str]) -> Iterator[str]:
+    """
+    Generator fed into a StreamingResponse.
+    Owns its DB session: request-scoped sessions are closed before the body is sent.
+    """
+    db: Session = ReadSessionLocal()
+    try:
+        batches = iter_conflictdata_batches(db, country_norm)
+        chunks = _csv_chunks(batches) if fmt == "csv" else _ndjson_chunks(batches)
+        yield from chunks
+        log.info("conflictdata_exported", extra={"format": fmt, "country_norm": country_norm})
+    finally:
+        db.close()
@@ -1,14 +1,11 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
 
-from app.models import ConflictData
-from sqlalchemy import select, func
-
-from sqlalchemy import select
-
 from app.core.normalize import norm
+from app.models import Admin1Region, ConflictData, Country
+
 
 def fetch_conflictdata_grouped_by_country(
     db: Session,
@@ -25,26 +22,47 @@ def fetch_conflictdata_grouped_by_country(
     if per_page < 1:
         per_page = 20
 
-    # subq = (
-    #     select(ConflictData.country_norm, ConflictData.country_raw)
-    #     .distinct(ConflictData.country_norm)
-    #     .order_by(ConflictData.country_norm.asc())
-    #     .limit(per_page)
-    #     .offset((page - 1) * per_page)
-    # )
-    # replaced with the following because This relies on Postgres behavior for distinct(column) + selecting another column. To avoid edge cases, we should do a safer query with min(country_raw) grouped by country_norm. That’s slightly more lines but more correct
+    return list(db.execute(country_page_query(page, per_page)).all())
 
-    subq = (
+
+def country_page_query(page: int, per_page: int):
+    # Countries come from the small dimension table; EXISTS keeps the ones that
+    # still have rows, probing the fact table's covering index by country_id
+    return (
         select(
-            ConflictData.country_norm,
-            func.min(ConflictData.country_raw).label("country_raw"),
+            Country.name_norm.label("country_norm"),
+            Country.name_raw.label("country_raw"),
         )
-        .group_by(ConflictData.country_norm)
-        .order_by(ConflictData.country_norm.asc())
+        .where(select(ConflictData.country_id).where(ConflictData.country_id == Country.id).exists())
+        .order_by(Country.name_norm.asc())
         .limit(per_page)
         .offset((page - 1) * per_page)
     )
-    return list(db.execute(subq).all())
+
+
+def conflict_rows_query():
+    """
+    conflict_data joined to its dimensions, with the column names the string
+    columns used to have (country_norm, country_raw, admin1_norm, admin1_raw).
+    """
+    return (
+        select(
+            Country.name_norm.label("country_norm"),
+            Country.name_raw.label("country_raw"),
+            Admin1Region.name_norm.label("admin1_norm"),
+            Admin1Region.name_raw.label("admin1_raw"),
+            ConflictData.population,
+            ConflictData.events,
+            ConflictData.score,
+        )
+        .join(Country, Country.id == ConflictData.country_id)
+        # The redundant country_id equality lets Postgres read both sides by country
+        # from their covering indexes (index-only) instead of probing admin1 by id
+        .join(
+            Admin1Region,
+            and_(Admin1Region.id == ConflictData.admin1_id, Admin1Region.country_id == ConflictData.country_id),
+        )
+    )
 
 
 def fetch_conflict_rows_for_countries(
@@ -55,17 +73,29 @@ def fetch_conflict_rows_for_countries(
         return []
 
     q = (
-        select(ConflictData)
-        .where(ConflictData.country_norm.in_(country_norms))
-        .order_by(ConflictData.country_norm.asc(), ConflictData.admin1_norm.asc())
+        conflict_rows_query()
+        .where(Country.name_norm.in_(country_norms))
+        .order_by(Country.name_norm.asc(), Admin1Region.name_norm.asc())
+    )
+    return list(db.execute(q).all())
+
+def country_rows_query(country_norm: str):
+    return (
+        conflict_rows_query()
+        .where(Country.name_norm == country_norm)
+        .order_by(Admin1Region.name_norm.asc())
     )
-    return list(db.execute(q).scalars().all())
+
 
 def fetch_conflict_rows_for_country(db: Session, country: str):
-    country_norm = norm(country)
-    q = (
+    return list(db.execute(country_rows_query(norm(country))).all())
+
+
+def find_conflict_row(db: Session, country_norm: str, admin1_norm: str):
+    """The conflict_data entity for a (country, admin1) pair, or None."""
+    return db.execute(
         select(ConflictData)
-        .where(ConflictData.country_norm == country_norm)
-        .order_by(ConflictData.admin1_norm.asc())
-    )
-    return list(db.execute(q).scalars().all())
+        .join(Admin1Region, Admin1Region.id == ConflictData.admin1_id)
+        .join(Country, Country.id == Admin1Region.country_id)
+        .where(Country.name_norm == country_norm, Admin1Region.name_norm == admin1_norm)
+    ).scalar_one_or_none()
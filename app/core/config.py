@@ -16,6 +16,16 @@ def get_env_optional(name: str) -> str | None:
 class Settings:
     DATABASE_URL: str = get_env("DATABASE_URL")
 
+    # Optional streaming replica for read-only endpoints; falls back to the
+    # primary when unset, unreachable or lagging more than the threshold
+    DATABASE_READ_URL: str | None = get_env_optional("DATABASE_READ_URL")
+    DATABASE_READ_MAX_LAG_SECONDS: float = float(os.getenv("DATABASE_READ_MAX_LAG_SECONDS", "5"))
+    DATABASE_READ_LAG_CHECK_SECONDS: float = float(os.getenv("DATABASE_READ_LAG_CHECK_SECONDS", "1"))
+
+    # Per-process pool; with N workers the node opens up to N * (size + overflow) connections
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
     JWT_SECRET: str = get_env("JWT_SECRET")
     JWT_ALG: str = os.getenv("JWT_ALG", "HS256")
     JWT_EXPIRE_MINUTES: int = int(os.getenv("JWT_EXPIRE_MINUTES", "10"))
@@ -24,5 +34,46 @@ class Settings:
     ADMIN_EMAIL: str | None = get_env_optional("ADMIN_EMAIL")
     ADMIN_PASSWORD: str | None = get_env_optional("ADMIN_PASSWORD")
 
+    # Arrow/Parquet snapshots, one file per dataset version and format
+    SNAPSHOT_DIR: str = os.getenv("SNAPSHOT_DIR", "/tmp/acled-snapshots")
+    # Older snapshots kept after a newer one is built, so in-flight downloads
+    # (in any worker) still find their file; younger files are never pruned
+    SNAPSHOT_KEEP_PREVIOUS: int = int(os.getenv("SNAPSHOT_KEEP_PREVIOUS", "2"))
+    SNAPSHOT_PRUNE_GRACE_SECONDS: float = float(os.getenv("SNAPSHOT_PRUNE_GRACE_SECONDS", "300"))
+
+    # Response compression / per-dataset-version response cache
+    COMPRESSION_MIN_BYTES: int = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+    # Node-local response cache shared by all workers (files on tmpfs); empty
+    # disables. gunicorn.conf.py turns it on. The default cap fits Docker's 64 MB /dev/shm.
+    SHARED_CACHE_DIR: str = os.getenv("SHARED_CACHE_DIR", "")
+    SHARED_CACHE_MAX_BYTES: int = int(os.getenv("SHARED_CACHE_MAX_BYTES", str(48 * 1024 * 1024)))
+
+    # How often one (advisory-lock elected) worker resets orphaned risk jobs
+    MAINTENANCE_INTERVAL_SECONDS: float = float(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "60"))
+    # How often that worker rebuilds the running risk aggregates from scratch to
+    # check them (a full scan of conflict_data); 0 disables
+    RISK_CONSISTENCY_CHECK_SECONDS: float = float(os.getenv("RISK_CONSISTENCY_CHECK_SECONDS", "3600"))
+
+    # Statements slower than this are logged (text only, no parameters)
+    DB_SLOW_STATEMENT_MS: int = int(os.getenv("DB_SLOW_STATEMENT_MS", "500"))
+
+    # Logging: "json" (one object per line, with request_id) or "text"
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # Requests slower than this are logged with their timing breakdown
+    SLOW_REQUEST_MS: int = int(os.getenv("SLOW_REQUEST_MS", "1000"))
+
+    # Admission control (per worker). "METHOD /route/template=max_in_flight", comma separated;
+    # routes not listed are unlimited. Over the cap -> 503, over the user's rate -> 429.
+    ADMISSION_CONCURRENCY_LIMITS: str = os.getenv(
+        "ADMISSION_CONCURRENCY_LIMITS",
+        "POST /login=8,POST /register=8,GET /conflictdata=32,POST /conflictdata/query=32,"
+        "GET /conflictdata/{country}/riskscore=32,GET /conflictdata/export=4,GET /conflictdata/snapshot=4",
+    )
+    # Token bucket per JWT subject (client IP when unauthenticated); 0 disables
+    RATE_LIMIT_PER_SECOND: float = float(os.getenv("RATE_LIMIT_PER_SECOND", "20"))
+    RATE_LIMIT_BURST: float = float(os.getenv("RATE_LIMIT_BURST", "40"))
+
 
 settings = Settings()
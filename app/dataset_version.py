@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.models import DatasetVersion
+
+# dataset_version holds exactly one row, created by the migration
+DATASET_VERSION_ROW_ID = 1
+
+
+def get_dataset_version(db: Session) -> int:
+    return db.execute(
+        select(DatasetVersion.version).where(DatasetVersion.id == DATASET_VERSION_ROW_ID)
+    ).scalar_one()
+
+
+def bump_dataset_version(db: Session) -> int:
+    """
+    Increments the version inside the caller's transaction (no commit here),
+    so the bump becomes visible atomically with the data change.
+    """
+    return db.execute(
+        update(DatasetVersion)
+        .where(DatasetVersion.id == DATASET_VERSION_ROW_ID)
+        .values(version=DatasetVersion.version + 1, updated_at=func.now())
+        .returning(DatasetVersion.version)
+    ).scalar_one()
@@ -1,7 +1,15 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+import logging
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
 
 from app.core.config import settings
+from app.metrics import InstrumentedQueuePool, instrument_engine
+
+log = logging.getLogger("app.db")
 
 
 class Base(DeclarativeBase):
@@ -11,9 +19,91 @@ class Base(DeclarativeBase):
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    poolclass=InstrumentedQueuePool,
+    pool_logging_name="primary",
+)
+instrument_engine(engine)
+
+read_engine = None
+if settings.DATABASE_READ_URL:
+    read_engine = create_engine(
+        settings.DATABASE_READ_URL,
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name="replica",
+    )
+    instrument_engine(read_engine)
+
+
+# 0 when the replica has replayed everything it received (an idle primary would
+# otherwise look like growing lag), and 0 when pointed at a non-replica.
+_REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
 )
 
+_lag_lock = threading.Lock()
+_lag_checked_at = float("-inf")
+_replica_ok = False
+
+
+def replica_within_lag() -> bool:
+    """
+    Cached (DATABASE_READ_LAG_CHECK_SECONDS) check that the replica is reachable
+    and no further behind than DATABASE_READ_MAX_LAG_SECONDS.
+    """
+    global _lag_checked_at, _replica_ok
+    if read_engine is None:
+        return False
+    if time.monotonic() - _lag_checked_at < settings.DATABASE_READ_LAG_CHECK_SECONDS:
+        return _replica_ok
+
+    with _lag_lock:
+        if time.monotonic() - _lag_checked_at < settings.DATABASE_READ_LAG_CHECK_SECONDS:
+            return _replica_ok
+        try:
+            with read_engine.connect() as conn:
+                lag = float(conn.execute(_REPLICA_LAG_SQL).scalar_one())
+            ok = lag <= settings.DATABASE_READ_MAX_LAG_SECONDS
+            if not ok:
+                log.warning("replica lag over threshold, reading from primary", extra={"lag_seconds": lag})
+        except Exception:
+            log.exception("replica lag check failed, reading from primary")
+            ok = False
+        _replica_ok = ok
+        _lag_checked_at = time.monotonic()
+        return ok
+
+
+class ReadRoutingSession(Session):
+    """
+    Sends reads to the replica (when healthy) and everything else to the primary.
+    The first write pins the session to the primary, so later reads in the same
+    request see it (read-your-writes). The replica decision is made once per
+    session so one request never mixes replica states.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["primary_pinned"] = True
+        if read_engine is None or self.info.get("primary_pinned"):
+            return engine
+        if "use_replica" not in self.info:
+            self.info["use_replica"] = replica_within_lag()
+        return read_engine if self.info["use_replica"] else engine
+
+
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+ReadSessionLocal = sessionmaker(class_=ReadRoutingSession, autoflush=False, autocommit=False)
 
 
 def get_db():
@@ -22,3 +112,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
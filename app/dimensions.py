@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import Admin1Region, ConflictData, Country
+
+
+def country_id_subquery(country_norm: str):
+    """
+    Scalar subquery resolving a normalized name to countries.id (NULL if unknown).
+    Postgres runs it once as an InitPlan, so the outer query still uses the
+    integer indexes.
+    """
+    return select(Country.id).where(Country.name_norm == country_norm).scalar_subquery()
+
+
+def get_country_id(db: Session, country_norm: str) -> Optional[int]:
+    return db.execute(select(Country.id).where(Country.name_norm == country_norm)).scalar_one_or_none()
+
+
+def upsert_countries(db: Session, raw_by_norm: dict[str, str]) -> dict[str, int]:
+    """
+    Ensures a countries row per normalized name and returns {name_norm: id}.
+    New countries start with the spelling passed in; refresh_country_names
+    settles name_raw once their rows are stored.
+    """
+    if not raw_by_norm:
+        return {}
+    db.execute(
+        insert(Country).on_conflict_do_nothing(index_elements=[Country.name_norm]),
+        [{"name_norm": n, "name_raw": r} for n, r in raw_by_norm.items()],
+    )
+    return dict(
+        db.execute(select(Country.name_norm, Country.id).where(Country.name_norm.in_(raw_by_norm))).all()
+    )
+
+
+def upsert_admin1_regions(db: Session, rows_by_key: dict[tuple[int, str], dict]) -> dict[tuple[int, str], int]:
+    """
+    Ensures an admin1_regions row per (country_id, name_norm) and returns
+    {(country_id, name_norm): id}. Each value holds name_raw, country_name_raw
+    and name_period_start; the spellings only move to an equal or newer week,
+    so re-importing an old week doesn't roll the display names back.
+    """
+    if not rows_by_key:
+        return {}
+    stmt = insert(Admin1Region)
+    ids = {
+        (c, n): i
+        for c, n, i in db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[Admin1Region.country_id, Admin1Region.name_norm],
+                set_={
+                    "name_raw": stmt.excluded.name_raw,
+                    "country_name_raw": stmt.excluded.country_name_raw,
+                    "name_period_start": stmt.excluded.name_period_start,
+                },
+                where=Admin1Region.name_period_start <= stmt.excluded.name_period_start,
+            ).returning(Admin1Region.country_id, Admin1Region.name_norm, Admin1Region.id),
+            [{"country_id": c, "name_norm": n, **v} for (c, n), v in rows_by_key.items()],
+        )
+    }
+    # Rows the period guard left alone aren't RETURNed
+    missing = [k for k in rows_by_key if k not in ids]
+    if missing:
+        ids.update(
+            ((c, n), i)
+            for c, n, i in db.execute(
+                select(Admin1Region.country_id, Admin1Region.name_norm, Admin1Region.id).where(
+                    tuple_(Admin1Region.country_id, Admin1Region.name_norm).in_(missing)
+                )
+            )
+        )
+    return ids
+
+
+def refresh_country_names(db: Session, country_ids: Iterable[int]) -> None:
+    """
+    Sets countries.name_raw to the smallest country spelling among the
+    country's current conflict_data rows (what min(country_raw) used to give),
+    in the caller's transaction. Countries without rows keep their last name.
+    """
+    ids = sorted(set(country_ids))
+    if not ids:
+        return
+    smallest = (
+        select(Admin1Region.country_id, func.min(Admin1Region.country_name_raw).label("name_raw"))
+        .join(ConflictData, ConflictData.admin1_id == Admin1Region.id)
+        .where(Admin1Region.country_id.in_(ids))
+        .group_by(Admin1Region.country_id)
+        .subquery()
+    )
+    db.execute(
+        update(Country)
+        .where(Country.id == smallest.c.country_id, Country.name_raw != smallest.c.name_raw)
+        .values(name_raw=smallest.c.name_raw)
+        .execution_options(synchronize_session=False)
+    )
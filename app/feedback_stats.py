@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import delete, desc, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.dimensions import country_id_subquery
+from app.history import week_start
+from app.models import (
+    Admin1Region,
+    ConflictData,
+    Country,
+    FeedbackAdmin1Stats,
+    FeedbackAdmin1WeeklyStats,
+    FeedbackCountryStats,
+)
+
+# Lock order, shared by record_feedback and remove_conflict_feedback so they can't
+# deadlock: conflict_data row (the feedback FK check / the delete), then the
+# rollup rows below in table order.
+
+
+def _upsert_count(db: Session, model, key: dict, country_id: int, at: datetime) -> None:
+    stmt = insert(model).values(**key, country_id=country_id, feedback_count=1, last_feedback_at=at)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={
+                "feedback_count": model.feedback_count + 1,
+                "last_feedback_at": func.greatest(model.last_feedback_at, stmt.excluded.last_feedback_at),
+            },
+        )
+    )
+
+
+def record_feedback(db: Session, conflict_data_id: int, country_id: int) -> None:
+    """
+    Counts one new feedback row in the rollups, inside the caller's transaction
+    (no commit here). Call it after the user_feedback insert is flushed.
+    """
+    at = datetime.now(timezone.utc)
+    _upsert_count(db, FeedbackAdmin1Stats, {"conflict_data_id": conflict_data_id}, country_id, at)
+    _upsert_count(
+        db,
+        FeedbackAdmin1WeeklyStats,
+        {"period_start": week_start(at.date()), "conflict_data_id": conflict_data_id},
+        country_id,
+        at,
+    )
+
+    stmt = insert(FeedbackCountryStats).values(country_id=country_id, feedback_count=1, last_feedback_at=at)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[FeedbackCountryStats.country_id],
+            set_={
+                "feedback_count": FeedbackCountryStats.feedback_count + 1,
+                "last_feedback_at": func.greatest(
+                    FeedbackCountryStats.last_feedback_at, stmt.excluded.last_feedback_at
+                ),
+            },
+        )
+    )
+
+
+def remove_conflict_feedback(db: Session, conflict_data_id: int, country_id: int) -> None:
+    """
+    Drops a deleted conflict_data row's feedback from the rollups, inside the
+    caller's transaction (no commit here). Call it after the conflict_data
+    delete is flushed; user_feedback itself goes by ON DELETE CASCADE.
+    """
+    removed = db.execute(
+        delete(FeedbackAdmin1Stats)
+        .where(FeedbackAdmin1Stats.conflict_data_id == conflict_data_id)
+        .returning(FeedbackAdmin1Stats.feedback_count)
+    ).scalar_one_or_none()
+    db.execute(delete(FeedbackAdmin1WeeklyStats).where(FeedbackAdmin1WeeklyStats.conflict_data_id == conflict_data_id))
+    if not removed:
+        return
+
+    # All of the country's feedback was on the deleted row: no rollup left
+    # to take last_feedback_at from (it is NOT NULL), so drop the row first
+    gone = db.execute(
+        delete(FeedbackCountryStats).where(
+            FeedbackCountryStats.country_id == country_id, FeedbackCountryStats.feedback_count <= removed
+        )
+    ).rowcount
+    if gone:
+        return
+
+    # The country's latest feedback may have been on the deleted row
+    last_at = (
+        select(func.max(FeedbackAdmin1Stats.last_feedback_at))
+        .where(FeedbackAdmin1Stats.country_id == country_id)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(FeedbackCountryStats)
+        .where(FeedbackCountryStats.country_id == country_id)
+        .values(feedback_count=FeedbackCountryStats.feedback_count - removed, last_feedback_at=last_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def fetch_country_feedback_stats(db: Session, week: Optional[date], limit: int):
+    """
+    Top countries by feedback count. All time: an index walk over
+    feedback_country_stats. For one week: the week's per-region rollup rows
+    summed per country, so cost follows the number of regions, not of feedback.
+    """
+    if week is None:
+        stats = select(
+            FeedbackCountryStats.country_id,
+            FeedbackCountryStats.feedback_count,
+            FeedbackCountryStats.last_feedback_at,
+        ).subquery()
+    else:
+        stats = (
+            select(
+                FeedbackAdmin1WeeklyStats.country_id,
+                func.sum(FeedbackAdmin1WeeklyStats.feedback_count).label("feedback_count"),
+                func.max(FeedbackAdmin1WeeklyStats.last_feedback_at).label("last_feedback_at"),
+            )
+            .where(FeedbackAdmin1WeeklyStats.period_start == week)
+            .group_by(FeedbackAdmin1WeeklyStats.country_id)
+            .subquery()
+        )
+    return db.execute(
+        select(
+            Country.name_raw.label("country_raw"),
+            stats.c.feedback_count,
+            stats.c.last_feedback_at,
+        )
+        .join(Country, Country.id == stats.c.country_id)
+        .order_by(desc(stats.c.feedback_count), Country.name_norm)
+        .limit(limit)
+    ).all()
+
+
+def fetch_admin1_feedback_stats(db: Session, week: Optional[date], country_norm: Optional[str], limit: int):
+    """
+    Top admin1 regions by feedback count, all time or for one week, optionally
+    within one country. Served by the (…, feedback_count) indexes: the walk
+    stops after `limit` rows.
+    """
+    model = FeedbackAdmin1Stats if week is None else FeedbackAdmin1WeeklyStats
+    q = (
+        select(
+            Country.name_raw.label("country_raw"),
+            Admin1Region.name_raw.label("admin1_raw"),
+            model.conflict_data_id,
+            model.feedback_count,
+            model.last_feedback_at,
+        )
+        .join(ConflictData, ConflictData.id == model.conflict_data_id)
+        .join(Admin1Region, Admin1Region.id == ConflictData.admin1_id)
+        .join(Country, Country.id == model.country_id)
+    )
+    if week is not None:
+        q = q.where(FeedbackAdmin1WeeklyStats.period_start == week)
+    if country_norm is not None:
+        q = q.where(model.country_id == country_id_subquery(country_norm))
+    return db.execute(
+        q.order_by(desc(model.feedback_count), model.conflict_data_id).limit(limit)
+    ).all()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, func, select, text
+from sqlalchemy.orm import Session
+
+from app.dimensions import country_id_subquery
+from app.models import Admin1Region, ConflictHistory
+
+HISTORY_TABLE = ConflictHistory.__tablename__
+
+# Upper bound for ?weeks= windows (10 years of weekly data)
+MAX_WINDOW_WEEKS = 520
+
+
+def week_start(d: date) -> date:
+    """Monday of d's week, same as Postgres date_trunc('week', d)."""
+    return d - timedelta(days=d.weekday())
+
+
+def current_week_start() -> date:
+    return week_start(datetime.now(timezone.utc).date())
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f"{HISTORY_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def ensure_history_partitions(db: Session, periods: Iterable[date]) -> None:
+    """
+    Creates missing monthly partitions for `periods` in the caller's transaction.
+    Existing ones are looked up first: CREATE ... PARTITION OF locks the parent
+    table against readers, so only pay for it when a new month starts.
+    """
+    months = {p.replace(day=1) for p in periods}
+    if not months:
+        return
+    existing = set(
+        db.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = CAST(:parent AS regclass)"
+            ),
+            {"parent": HISTORY_TABLE},
+        ).scalars()
+    )
+    for month in sorted(months):
+        name = partition_name(month)
+        if name in existing:
+            continue
+        # Bounds are ISO dates produced here, not user input
+        db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {HISTORY_TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+            )
+        )
+
+
+def window_start(db: Session, weeks: int) -> Optional[date]:
+    """
+    First period_start of a `weeks`-long window ending at the latest imported week
+    (which counts as week 1). Anchored on the data rather than today, so a feed that
+    is a few days late doesn't empty the window. None if there is no history.
+    The date goes into the query as a parameter, so the planner prunes partitions.
+    """
+    latest = db.execute(select(func.max(ConflictHistory.period_start))).scalar_one_or_none()
+    if latest is None:
+        return None
+    return latest - timedelta(weeks=weeks - 1)
+
+
+def history_rows_query(country_norm: str, since: date):
+    return (
+        select(
+            ConflictHistory.period_start,
+            Admin1Region.name_raw.label("admin1_raw"),
+            ConflictHistory.population,
+            ConflictHistory.events,
+            ConflictHistory.score,
+        )
+        # country_id equality: see conflict_queries.conflict_rows_query
+        .join(
+            Admin1Region,
+            and_(
+                Admin1Region.id == ConflictHistory.admin1_id,
+                Admin1Region.country_id == ConflictHistory.country_id,
+            ),
+        )
+        .where(
+            ConflictHistory.country_id == country_id_subquery(country_norm),
+            ConflictHistory.period_start >= since,
+        )
+        .order_by(ConflictHistory.period_start.desc(), Admin1Region.name_norm.asc())
+    )
+
+
+def fetch_history_rows_for_country(db: Session, country_norm: str, since: date):
+    """Rows with period_start, admin1_raw, population, events, score; newest week first."""
+    return list(db.execute(history_rows_query(country_norm, since)).all())
+
+
+def country_has_history(db: Session, country_norm: str, since: date) -> bool:
+    return (
+        db.execute(
+            select(ConflictHistory.period_start)
+            .where(
+                ConflictHistory.country_id == country_id_subquery(country_norm),
+                ConflictHistory.period_start >= since,
+            )
+            .limit(1)
+        ).scalar_one_or_none()
+        is not None
+    )
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import gzip
+import os
+import shutil
+import tempfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+import brotli
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+ENCODING_BROTLI = "br"
+ENCODING_GZIP = "gzip"
+
+# Server preference when the client accepts both with equal q
+_PREFERRED = (ENCODING_BROTLI, ENCODING_GZIP)
+
+GZIP_LEVEL = 6
+# Cached bodies are compressed once per dataset version, so spend more CPU on them
+BROTLI_QUALITY_CACHED = 9
+BROTLI_QUALITY_STREAM = 4
+
+
+def negotiate_encoding(accept_encoding: Optional[str], offered: tuple[str, ...] = _PREFERRED) -> Optional[str]:
+    """
+    Picks the best of `offered` from an Accept-Encoding header, or None for identity.
+    """
+    if not accept_encoding:
+        return None
+
+    q_by_coding: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        q_by_coding[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in offered:
+        q = q_by_coding.get(coding, q_by_coding.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """A response body with its precompressed variants (None when not worth compressing)."""
+
+    identity: bytes
+    gzip: Optional[bytes] = None
+    br: Optional[bytes] = None
+
+    def variant(self, encoding: Optional[str]) -> tuple[bytes, Optional[str]]:
+        if encoding == ENCODING_BROTLI and self.br is not None:
+            return self.br, ENCODING_BROTLI
+        if encoding == ENCODING_GZIP and self.gzip is not None:
+            return self.gzip, ENCODING_GZIP
+        return self.identity, None
+
+    @property
+    def size(self) -> int:
+        return len(self.identity) + len(self.gzip or b"") + len(self.br or b"")
+
+
+def encode_body(body: bytes) -> EncodedBody:
+    if len(body) < settings.COMPRESSION_MIN_BYTES:
+        return EncodedBody(identity=body)
+    return EncodedBody(
+        identity=body,
+        gzip=gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0),
+        br=brotli.compress(body, quality=BROTLI_QUALITY_CACHED),
+    )
+
+
+def encoded_response(
+    request: Request,
+    body: EncodedBody,
+    *,
+    media_type: str = "application/json",
+    status_code: int = 200,
+) -> Response:
+    content, encoding = body.variant(negotiate_encoding(request.headers.get("accept-encoding")))
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=content, status_code=status_code, media_type=media_type, headers=headers)
+
+
+def compress_stream(chunks: Iterator[str], encoding: Optional[str]) -> Iterator[bytes]:
+    """
+    Incrementally compresses a text stream. Each input chunk is flushed so the
+    client keeps receiving data at the same cadence as the uncompressed stream.
+    """
+    if encoding == ENCODING_BROTLI:
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY_STREAM)
+        for chunk in chunks:
+            out = compressor.process(chunk.encode("utf-8")) + compressor.flush()
+            if out:
+                yield out
+        yield compressor.finish()
+    elif encoding == ENCODING_GZIP:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            out = compressor.compress(chunk.encode("utf-8")) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if out:
+                yield out
+        yield compressor.flush()
+    else:
+        for chunk in chunks:
+            yield chunk.encode("utf-8")
+
+
+def gzip_file(path: Path) -> Path:
+    """Writes path + '.gz' next to path (atomically) and returns it."""
+    target = path.with_name(path.name + ".gz")
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".building-", suffix=".gz")
+    os.close(fd)
+    try:
+        with path.open("rb") as src, gzip.GzipFile(tmp, "wb", compresslevel=GZIP_LEVEL, mtime=0) as dst:
+            shutil.copyfileobj(src, dst, length=1024 * 1024)
+        os.replace(tmp, target)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return target
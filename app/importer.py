@@ -1,19 +1,31 @@
 from __future__ import annotations
 
+import argparse
 import csv
 import logging
+from datetime import date
 from decimal import Decimal
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from app.core.normalize import norm
-from app.models import ConflictData
+from app.dataset_version import bump_dataset_version
+from app.db import SessionLocal
+from app.dimensions import refresh_country_names, upsert_admin1_regions, upsert_countries
+from app.history import current_week_start, ensure_history_partitions, week_start
+from app.models import ConflictData, ConflictHistory
+from app.risk_cache import mark_windows_stale, refresh_current_aggregates
 
 log = logging.getLogger("app.importer")
 
+PROGRESS_EVERY_ROWS = 10_000
+
+_VALUE_COLUMNS = ("population", "events", "score")
+
 
 def _parse_int_optional(val: str) -> Optional[int]:
     v = val.strip()
@@ -22,17 +34,18 @@ def _parse_int_optional(val: str) -> Optional[int]:
     return int(v)
 
 
-def import_sample_csv_if_empty(db: Session, csv_path: Path) -> None:
-    existing = db.execute(select(func.count()).select_from(ConflictData)).scalar_one()
-    if existing > 0:
-        log.info("CSV import skipped (conflict_data already has rows)", extra={"rows": existing})
-        return
-
-    if not csv_path.exists():
-        log.error("CSV import failed: file not found", extra={"path": str(csv_path)})
-        return
-
-    rows = []
+def _read_csv(
+    csv_path: Path,
+    default_period: date,
+    on_progress: Optional[Callable[[int], None]],
+) -> list[dict]:
+    """
+    Parses rows into dicts keyed by name (ids are resolved in _store_rows). An optional `period` column (ISO date)
+    places each row in its week; otherwise every row belongs to default_period.
+    A (country, admin1, week) repeated in the file keeps its last row.
+    """
+    rows: dict[tuple, dict] = {}
+    parsed = 0
     with csv_path.open(newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for r in reader:
@@ -43,18 +56,164 @@ def import_sample_csv_if_empty(db: Session, csv_path: Path) -> None:
             if events < 0:
                 raise ValueError("events must be non-negative")
 
-            rows.append(
-                ConflictData(
-                    country_raw=country_raw.strip(),
-                    country_norm=norm(country_raw),
-                    admin1_raw=admin1_raw.strip(),
-                    admin1_norm=norm(admin1_raw),
-                    population=_parse_int_optional(r.get("population", "")),
-                    events=events,
-                    score=Decimal(r["score"]),
-                )
+            # csv.DictReader fills missing trailing fields with None
+            period = (r.get("period") or "").strip()
+            period_start = week_start(date.fromisoformat(period)) if period else default_period
+
+            row = dict(
+                period_start=period_start,
+                country_raw=country_raw.strip(),
+                country_norm=norm(country_raw),
+                admin1_raw=admin1_raw.strip(),
+                admin1_norm=norm(admin1_raw),
+                population=_parse_int_optional(r.get("population", "")),
+                events=events,
+                score=Decimal(r["score"]),
             )
+            rows[(period_start, row["country_norm"], row["admin1_norm"])] = row
+            parsed += 1
+            if on_progress is not None and parsed % PROGRESS_EVERY_ROWS == 0:
+                on_progress(parsed)
+
+    if on_progress is not None:
+        on_progress(parsed)
+    return list(rows.values())
+
+
+def _store_rows(db: Session, rows: list[dict]) -> set[int]:
+    """
+    Resolves names to dimension ids, upserts rows into conflict_history, then moves
+    each admin1's conflict_data row forward to its newest observation.
+    conflict_data rows are updated in place (never replaced), so their ids and the
+    feedback pointing at them survive. Returns the ids of the countries touched.
+    No commit here.
+    """
+    if not rows:
+        return set()
+
+    country_raw: dict[str, str] = {}
+    for r in rows:
+        cn = r["country_norm"]
+        if cn not in country_raw or r["country_raw"] < country_raw[cn]:
+            country_raw[cn] = r["country_raw"]
+    country_ids = upsert_countries(db, country_raw)
+
+    # Newest observation per admin1 decides its current row and raw spelling
+    latest: dict[tuple, dict] = {}
+    for r in rows:
+        key = (country_ids[r["country_norm"]], r["admin1_norm"])
+        if key not in latest or latest[key]["period_start"] <= r["period_start"]:
+            latest[key] = r
+    admin1_ids = upsert_admin1_regions(
+        db,
+        {
+            k: {
+                "name_raw": r["admin1_raw"],
+                "country_name_raw": r["country_raw"],
+                "name_period_start": r["period_start"],
+            }
+            for k, r in latest.items()
+        },
+    )
+
+    def fact(r: dict) -> dict:
+        country_id = country_ids[r["country_norm"]]
+        return {
+            "country_id": country_id,
+            "admin1_id": admin1_ids[(country_id, r["admin1_norm"])],
+            "period_start": r["period_start"],
+            **{c: r[c] for c in _VALUE_COLUMNS},
+        }
+
+    ensure_history_partitions(db, {r["period_start"] for r in rows})
+    hist = insert(ConflictHistory)
+    db.execute(
+        hist.on_conflict_do_update(
+            index_elements=[ConflictHistory.period_start, ConflictHistory.admin1_id],
+            set_={c: hist.excluded[c] for c in _VALUE_COLUMNS},
+        ),
+        [fact(r) for r in rows],
+    )
+
+    cur = insert(ConflictData)
+    db.execute(
+        cur.on_conflict_do_update(
+            index_elements=[ConflictData.admin1_id],
+            set_={c: cur.excluded[c] for c in (*_VALUE_COLUMNS, "period_start")},
+            # Re-importing an older week must not roll the current data back
+            where=ConflictData.period_start <= cur.excluded.period_start,
+        ),
+        [fact(r) for r in latest.values()],
+    )
+    refresh_country_names(db, country_ids.values())
+    return set(country_ids.values())
 
-    db.add_all(rows)
+
+def import_sample_csv_if_empty(
+    db: Session,
+    csv_path: Path,
+    on_progress: Optional[Callable[[int], None]] = None,
+    period_start: Optional[date] = None,
+) -> None:
+    existing = db.execute(select(func.count()).select_from(ConflictData)).scalar_one()
+    if existing > 0:
+        log.info("CSV import skipped (conflict_data already has rows)", extra={"rows": existing})
+        return
+
+    if not csv_path.exists():
+        log.error("CSV import failed: file not found", extra={"path": str(csv_path)})
+        return
+
+    rows = _read_csv(csv_path, week_start(period_start or current_week_start()), on_progress)
+
+    refresh_current_aggregates(db, _store_rows(db, rows), check_drift=False)
+    bump_dataset_version(db)
     db.commit()
     log.info("CSV import completed", extra={"inserted": len(rows), "path": str(csv_path)})
+
+
+def import_period_csv(
+    db: Session,
+    csv_path: Path,
+    period_start: date,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Imports one feed drop (e.g. a weekly ACLED export) for the week containing
+    period_start. Re-importing the same week replaces that week only; earlier
+    weeks stay in conflict_history. The touched countries' current risk scores
+    are refreshed in the same transaction; history-window scores are invalidated.
+    """
+    rows = _read_csv(csv_path, week_start(period_start), on_progress)
+
+    refresh_current_aggregates(db, _store_rows(db, rows), check_drift=False)
+    mark_windows_stale(db)
+    bump_dataset_version(db)
+    db.commit()
+    log.info(
+        "period import completed",
+        extra={"rows": len(rows), "period_start": week_start(period_start).isoformat(), "path": str(csv_path)},
+    )
+    return len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import one period of conflict data (CSV) into the database.")
+    parser.add_argument("csv_path", type=Path)
+    parser.add_argument(
+        "--period",
+        type=date.fromisoformat,
+        default=None,
+        help="any date in the data's week (default: current week); a `period` CSV column overrides it per row",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        import_period_csv(db, args.csv_path, args.period or current_week_start())
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
+from datetime import date
 from pathlib import Path
+import json
 import logging
 
 from fastapi import (
@@ -7,32 +9,37 @@ from fastapi import (
     Query,
     HTTPException,
     BackgroundTasks,
+    Request,
+    Response,
 )
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.db import SessionLocal, get_db
-from app.importer import import_sample_csv_if_empty
+from app.db import SessionLocal, get_db, get_read_db
+from app.startup import start_background_startup, startup_state
 
 from app.auth.jwt import create_access_token
 from app.auth.security import hash_password, verify_password
-from app.auth.admin_seed import seed_admin_if_configured
-from app.auth.deps import get_current_user, require_admin
+from app.auth.deps import get_current_read_user, get_current_user, require_admin
 
 from app.schemas.auth import LoginIn, RegisterIn, TokenOut, UnauthorizedOut
 from app.schemas.conflict import (
+    MAX_SELECTED_COUNTRIES,
+    ConflictCountriesIn,
+    ConflictCountrySelectionOut,
     ConflictDataPageOut,
     ConflictCountryGroupOut,
+    ConflictHistoryRowOut,
     ConflictRowOut,
 )
 from app.schemas.risk import RiskScoreOut, CalculatingOut
-from app.schemas.feedback import FeedbackIn, FeedbackOut
+from app.schemas.feedback import FeedbackIn, FeedbackOut, FeedbackStatsOut, FeedbackStatsRowOut
 from app.schemas.delete_conflict import ConflictDeleteIn, DeleteOut
 from app.schemas.errors import NotFoundOut, UnprocessableEntityOut, ConflictOut
-from app.schemas.meta import HealthOut
+from app.schemas.meta import HealthOut, ReadyOut
 
 from app.models import User, ConflictData, UserFeedback
 
@@ -40,26 +47,72 @@ from app.conflict_queries import (
     fetch_conflictdata_grouped_by_country,
     fetch_conflict_rows_for_countries,
     fetch_conflict_rows_for_country,
+    find_conflict_row,
+)
+from app.dimensions import country_id_subquery, refresh_country_names
+from app.feedback_stats import (
+    fetch_admin1_feedback_stats,
+    fetch_country_feedback_stats,
+    record_feedback,
+    remove_conflict_feedback,
+)
+
+from app.conflict_export import (
+    EXPORT_MEDIA_TYPES,
+    stream_conflictdata_export,
 )
 
+from app.snapshot_export import SNAPSHOT_MEDIA_TYPES, get_or_build_snapshot
+
+from app.history import (
+    MAX_WINDOW_WEEKS,
+    country_has_history,
+    fetch_history_rows_for_country,
+    week_start,
+    window_start,
+)
 from app.risk_cache import (
     STATUS_READY,
-    STATUS_STALE,
+    WINDOW_CURRENT,
     get_or_create_cache_row,
+    apply_current_delta,
+    get_ready_score,
     try_mark_computing,
-    reset_computing_to_failed_on_startup,
 )
 
 from app.risk_compute import compute_country_risk_score
+from app.dataset_version import bump_dataset_version, get_dataset_version
+from app.http_compression import (
+    ENCODING_GZIP,
+    compress_stream,
+    encode_body,
+    encoded_response,
+    negotiate_encoding,
+)
+from app.response_cache import response_cache
+from app.metrics import MetricsMiddleware, render_metrics
+from app.admission import AdmissionControlMiddleware
+from app.tracing import RequestContextMiddleware, current_request_id, trace_phase
+from app.core.logging_config import configure_logging
 from app.core.normalize import norm
 
 from fastapi.security import HTTPBearer
+from pydantic import TypeAdapter
 
 
 
 log = logging.getLogger("app")
 
+_conflict_rows_adapter = TypeAdapter(list[ConflictRowOut])
+_history_rows_adapter = TypeAdapter(list[ConflictHistoryRowOut])
+
+configure_logging()
+
 app = FastAPI(title="ACLED conflicts API", version="0.1.0")
+# Last added runs first: request id -> metrics -> admission control
+app.add_middleware(AdmissionControlMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestContextMiddleware)
 
 bearer_scheme = HTTPBearer(
     bearerFormat="JWT",
@@ -70,21 +123,38 @@ bearer_scheme = HTTPBearer(
 
 @app.on_event("startup")
 def startup() -> None:
-    csv_path = Path("sample_data.csv")
-    db = SessionLocal()
-    try:
-        seed_admin_if_configured(db)
-        import_sample_csv_if_empty(db, csv_path)
-        reset_computing_to_failed_on_startup(db)
-    finally:
-        db.close()
+    # Seeding/import/reset run in the background; /ready reports when they're done
+    start_background_startup(Path("sample_data.csv"))
 
 
 @app.get("/health", tags=["meta"], response_model=HealthOut)
 def health() -> HealthOut:
+    # Liveness only: the process is up and serving
     return HealthOut(status="ok")
 
 
+@app.get("/ready", tags=["meta"], response_model=ReadyOut, responses={503: {"model": ReadyOut}})
+def ready():
+    state = startup_state
+    payload = ReadyOut(
+        status="ready" if state.ready else "starting" if state.error is None else "failed",
+        phase=state.phase,
+        elapsed_seconds=state.elapsed_seconds(),
+        rows_parsed=state.rows_parsed,
+        error=state.error,
+    )
+    if not state.ready:
+        return JSONResponse(status_code=503, content=payload.model_dump())
+    return payload
+
+
+@app.get("/metrics", tags=["meta"], response_class=Response, include_in_schema=False)
+def metrics() -> Response:
+    # Prometheus text format; meant for the scraper, so no JWT
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 log = logging.getLogger("app.auth")
 
 
@@ -134,48 +204,196 @@ def login(payload: LoginIn) -> TokenOut:
         db.close()
 
 
+def _group_rows_by_country(rows, country_raw_by_norm: dict[str, str]) -> list[ConflictCountryGroupOut]:
+    """One group per country in country_raw_by_norm (in its order), rows as fetched."""
+    grouped: dict[str, list[ConflictRowOut]] = {}
+    for r in rows:
+        grouped.setdefault(r.country_norm, []).append(
+            ConflictRowOut(
+                admin1_raw=r.admin1_raw,
+                population=r.population,
+                events=r.events,
+                score=r.score,
+            )
+        )
+    return [
+        ConflictCountryGroupOut(country_raw=raw, rows=grouped.get(cn, []))
+        for cn, raw in country_raw_by_norm.items()
+    ]
+
+
+def _selected_countries_response(request: Request, db: Session, names: list[str]) -> Response:
+    # norm -> name as sent (first spelling wins), in request order
+    requested: dict[str, str] = {}
+    for name in names:
+        if name.strip():
+            requested.setdefault(norm(name), name.strip())
+    if not requested:
+        raise HTTPException(status_code=422, detail="countries must name at least one country")
+    if len(requested) > MAX_SELECTED_COUNTRIES:
+        raise HTTPException(status_code=422, detail=f"at most {MAX_SELECTED_COUNTRIES} countries per request")
+
+    version = get_dataset_version(db)
+    # JSON keeps names containing commas apart, and includes the spellings echoed in `unknown`
+    cache_key = "conflictdata:countries:" + json.dumps(list(requested.items()))
+    cached = response_cache.get(version, cache_key)
+    if cached is not None:
+        return encoded_response(request, cached)
+
+    # One query for all of them (IN list on the indexed countries.name_norm)
+    rows = fetch_conflict_rows_for_countries(db, list(requested))
+
+    with trace_phase("serialize"):
+        raw_by_norm = {r.country_norm: r.country_raw for r in rows}
+        found = {cn: raw_by_norm[cn] for cn in requested if cn in raw_by_norm}
+        payload = ConflictCountrySelectionOut(
+            countries=_group_rows_by_country(rows, found),
+            unknown=[name for cn, name in requested.items() if cn not in raw_by_norm],
+        )
+        cached = encode_body(payload.model_dump_json().encode("utf-8"))
+    response_cache.put(version, cache_key, cached)
+    return encoded_response(request, cached)
+
+
 @app.get(
     "/conflictdata",
-    response_model=ConflictDataPageOut,
-    responses={401: {"model": UnauthorizedOut}},
+    response_model=ConflictDataPageOut | ConflictCountrySelectionOut,
+    responses={401: {"model": UnauthorizedOut}, 422: {"model": UnprocessableEntityOut}},
     tags=["conflictdata"],
     dependencies=[Depends(bearer_scheme)],
 )
 def list_conflictdata(
+    request: Request,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
-    _: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> ConflictDataPageOut:
-    countries = fetch_conflictdata_grouped_by_country(db, page=page, per_page=per_page)
-    country_norms = [c[0] for c in countries]
+    countries: str | None = Query(
+        None,
+        description="comma separated country names; returns just those countries (no paging), "
+        "listing names without data under `unknown`",
+    ),
+    _: User = Depends(get_current_read_user),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    if countries is not None:
+        return _selected_countries_response(request, db, countries.split(","))
+
+    # Read the version before the rows: the cached body is then never older than its key
+    version = get_dataset_version(db)
+    cache_key = f"conflictdata:page:{page}:{per_page}"
+    cached = response_cache.get(version, cache_key)
+    if cached is not None:
+        return encoded_response(request, cached)
+
+    page_countries = fetch_conflictdata_grouped_by_country(db, page=page, per_page=per_page)
+    country_norms = [c[0] for c in page_countries]
 
     rows = fetch_conflict_rows_for_countries(db, country_norms)
 
-    # Map norm -> display raw
-    country_raw_by_norm = {cn: cr for cn, cr in countries}
+    with trace_phase("serialize"):
+        # Map norm -> display raw, in page order
+        out = _group_rows_by_country(rows, {cn: cr for cn, cr in page_countries})
+        payload = ConflictDataPageOut(page=page, per_page=per_page, countries=out)
+        cached = encode_body(payload.model_dump_json().encode("utf-8"))
+    response_cache.put(version, cache_key, cached)
+    return encoded_response(request, cached)
 
-    grouped: dict[str, list[ConflictRowOut]] = {}
-    for r in rows:
-        grouped.setdefault(r.country_norm, []).append(
-            ConflictRowOut(
-                admin1_raw=r.admin1_raw,
-                population=r.population,
-                events=r.events,
-                score=r.score,
-            )
-        )
 
-    out = []
-    for cn in country_norms:
-        out.append(
-            ConflictCountryGroupOut(
-                country_raw=country_raw_by_norm[cn],
-                rows=grouped.get(cn, []),
-            )
-        )
+@app.post(
+    "/conflictdata/query",
+    response_model=ConflictCountrySelectionOut,
+    responses={401: {"model": UnauthorizedOut}, 422: {"model": UnprocessableEntityOut}},
+    tags=["conflictdata"],
+    dependencies=[Depends(bearer_scheme)],
+)
+def query_conflictdata(
+    request: Request,
+    payload: ConflictCountriesIn,
+    _: User = Depends(get_current_read_user),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    """Same as GET /conflictdata?countries=..., for lists too long for a URL."""
+    return _selected_countries_response(request, db, payload.countries)
+
 
-    return ConflictDataPageOut(page=page, per_page=per_page, countries=out)
+@app.get(
+    "/conflictdata/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/csv": {}, "application/x-ndjson": {}}},
+        401: {"model": UnauthorizedOut},
+        404: {"model": NotFoundOut},
+    },
+    tags=["conflictdata"],
+    dependencies=[Depends(bearer_scheme)],
+)
+def export_conflictdata(
+    request: Request,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    country: str | None = Query(None, min_length=1, max_length=50),
+    _: User = Depends(get_current_read_user),
+    db: Session = Depends(get_read_db),
+) -> StreamingResponse:
+    country_norm = norm(country) if country is not None else None
+
+    # Headers go out before the first row, so a missing country has to be caught up front
+    if country_norm is not None:
+        exists = db.execute(
+            select(ConflictData.id).where(ConflictData.country_id == country_id_subquery(country_norm)).limit(1)
+        ).scalar_one_or_none()
+        if not exists:
+            raise HTTPException(status_code=404, detail="country not found")
+
+    filename = f"conflictdata.{fmt}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+
+    return StreamingResponse(
+        compress_stream(stream_conflictdata_export(fmt, country_norm), encoding),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers=headers,
+    )
+
+
+@app.get(
+    "/conflictdata/snapshot",
+    response_class=FileResponse,
+    responses={
+        200: {"content": {"application/vnd.apache.arrow.file": {}, "application/vnd.apache.parquet": {}}},
+        304: {"description": "Not modified"},
+        401: {"model": UnauthorizedOut},
+    },
+    tags=["conflictdata"],
+    dependencies=[Depends(bearer_scheme)],
+)
+def get_conflictdata_snapshot(
+    request: Request,
+    fmt: str = Query("arrow", alias="format", pattern="^(arrow|parquet)$"),
+    _: User = Depends(get_current_user),
+):
+    path, key = get_or_build_snapshot(fmt)
+
+    headers = {"Vary": "Accept-Encoding"}
+    etag = f'"{key}"'
+    # Arrow files are stored uncompressed (for zero-copy reads) with a gzip sibling;
+    # Parquet is already zstd-compressed internally.
+    gz_path = path.with_name(path.name + ".gz")
+    if gz_path.exists() and negotiate_encoding(request.headers.get("accept-encoding"), (ENCODING_GZIP,)):
+        path = gz_path
+        etag = f'"{key}-gzip"'
+        headers["Content-Encoding"] = ENCODING_GZIP
+    headers["ETag"] = etag
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(
+        path,
+        media_type=SNAPSHOT_MEDIA_TYPES[fmt],
+        filename=f"conflict_data-{key}.{fmt}",
+        headers=headers,
+    )
 
 
 @app.get(
@@ -189,23 +407,38 @@ def list_conflictdata(
     dependencies=[Depends(bearer_scheme)],
 )
 def get_conflictdata_country(
+    request: Request,
     country: str,
-    _: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> list[ConflictRowOut]:
+    _: User = Depends(get_current_read_user),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    """
+    The path segments `export` and `snapshot` are matched by the routes above;
+    countries with those names are read through GET /conflictdata?countries=.
+    """
+    version = get_dataset_version(db)
+    cache_key = f"conflictdata:country:{norm(country)}"
+    cached = response_cache.get(version, cache_key)
+    if cached is not None:
+        return encoded_response(request, cached)
+
     rows = fetch_conflict_rows_for_country(db, country)
     if not rows:
         raise HTTPException(status_code=404, detail="country not found")
 
-    return [
-        ConflictRowOut(
-            admin1_raw=r.admin1_raw,
-            population=r.population,
-            events=r.events,
-            score=r.score,
-        )
-        for r in rows
-    ]
+    with trace_phase("serialize"):
+        payload = [
+            ConflictRowOut(
+                admin1_raw=r.admin1_raw,
+                population=r.population,
+                events=r.events,
+                score=r.score,
+            )
+            for r in rows
+        ]
+        cached = encode_body(_conflict_rows_adapter.dump_json(payload))
+    response_cache.put(version, cache_key, cached)
+    return encoded_response(request, cached)
 
 
 @app.get(
@@ -220,32 +453,102 @@ def get_conflictdata_country(
     dependencies=[Depends(bearer_scheme)],
 )
 def get_country_riskscore(
+    request: Request,
     country: str,
     background: BackgroundTasks,
-    _: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    weeks: int | None = Query(None, ge=1, le=MAX_WINDOW_WEEKS),
+    _: User = Depends(get_current_read_user),
+    db: Session = Depends(get_read_db),
 ):
     country_norm = norm(country)
-
-    # If country doesn't exist at all, return 404
-    exists = db.execute(
-        select(ConflictData.id).where(ConflictData.country_norm == country_norm).limit(1)
-    ).scalar_one_or_none()
+    window_weeks = weeks or WINDOW_CURRENT
+
+    # A ready score only changes together with the data, i.e. with the dataset version
+    version = get_dataset_version(db)
+    cache_key = f"riskscore:{country_norm}:{window_weeks}"
+    cached = response_cache.get(version, cache_key)
+    if cached is not None:
+        return encoded_response(request, cached)
+
+    # If country has no data (in the window), return 404
+    if window_weeks == WINDOW_CURRENT:
+        exists = db.execute(
+            select(ConflictData.id).where(ConflictData.country_id == country_id_subquery(country_norm)).limit(1)
+        ).scalar_one_or_none()
+    else:
+        since = window_start(db, window_weeks)
+        exists = since is not None and country_has_history(db, country_norm, since)
     if not exists:
         raise HTTPException(status_code=404, detail="country not found")
 
-    cache = get_or_create_cache_row(db, country)
-
-    if cache.status == STATUS_READY and cache.score is not None:
-        return RiskScoreOut(country_norm=cache.country_norm, score=cache.score)
+    # Read-only hit check first (replica-eligible). Anything else writes, which
+    # pins the session to the primary for the rest of the request.
+    score = get_ready_score(db, country_norm, window_weeks)
+    if score is None:
+        cache = get_or_create_cache_row(db, country_norm, window_weeks)
+        if cache.status == STATUS_READY and cache.score is not None:
+            score = cache.score
+
+    if score is not None:
+        with trace_phase("serialize"):
+            payload = RiskScoreOut(country_norm=country_norm, score=score, window_weeks=weeks)
+            cached = encode_body(payload.model_dump_json(exclude_none=True).encode("utf-8"))
+        response_cache.put(version, cache_key, cached)
+        return encoded_response(request, cached)
 
     # stale/failed/computing => ensure job is enqueued
-    should_compute = try_mark_computing(db, cache.country_norm)
+    should_compute = try_mark_computing(db, country_norm, window_weeks)
     if should_compute:
-        background.add_task(compute_country_risk_score, cache.country_norm)
+        background.add_task(compute_country_risk_score, country_norm, window_weeks, request_id=current_request_id())
 
     return JSONResponse(status_code=202, content={"detail": "calculating"})
 
+
+@app.get(
+    "/conflictdata/{country}/history",
+    response_model=list[ConflictHistoryRowOut],
+    responses={
+        401: {"model": UnauthorizedOut},
+        404: {"model": NotFoundOut},
+    },
+    tags=["conflictdata"],
+    dependencies=[Depends(bearer_scheme)],
+)
+def get_conflictdata_country_history(
+    request: Request,
+    country: str,
+    weeks: int = Query(4, ge=1, le=MAX_WINDOW_WEEKS),
+    _: User = Depends(get_current_read_user),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    # Newest week first; the window ends at the latest imported week
+    country_norm = norm(country)
+    version = get_dataset_version(db)
+    cache_key = f"history:{country_norm}:{weeks}"
+    cached = response_cache.get(version, cache_key)
+    if cached is not None:
+        return encoded_response(request, cached)
+
+    since = window_start(db, weeks)
+    rows = fetch_history_rows_for_country(db, country_norm, since) if since is not None else []
+    if not rows:
+        raise HTTPException(status_code=404, detail="country not found")
+
+    with trace_phase("serialize"):
+        payload = [
+            ConflictHistoryRowOut(
+                period_start=r.period_start,
+                admin1_raw=r.admin1_raw,
+                population=r.population,
+                events=r.events,
+                score=r.score,
+            )
+            for r in rows
+        ]
+        cached = encode_body(_history_rows_adapter.dump_json(payload))
+    response_cache.put(version, cache_key, cached)
+    return encoded_response(request, cached)
+
 @app.post(
     "/conflictdata/{admin1}/userfeedback",
     response_model=FeedbackOut,
@@ -270,12 +573,7 @@ def create_user_feedback(
     country_norm = norm(payload.country)
     admin1_norm = norm(admin1)
 
-    conflict = db.execute(
-        select(ConflictData).where(
-            ConflictData.country_norm == country_norm,
-            ConflictData.admin1_norm == admin1_norm,
-        )
-    ).scalar_one_or_none()
+    conflict = find_conflict_row(db, country_norm, admin1_norm)
 
     if not conflict:
         raise HTTPException(status_code=404, detail="conflict_data row not found for country+admin1")
@@ -286,6 +584,9 @@ def create_user_feedback(
         feedback_text=feedback_text,
     )
     db.add(fb)
+    # Insert first: its FK check locks the conflict_data row before the rollups
+    db.flush()
+    record_feedback(db, conflict.id, conflict.country_id)
     db.commit()
     db.refresh(fb)
 
@@ -298,6 +599,49 @@ def create_user_feedback(
     return FeedbackOut(id=fb.id, conflict_data_id=fb.conflict_data_id)
 
 
+@app.get(
+    "/feedback/stats",
+    response_model=FeedbackStatsOut,
+    response_model_exclude_none=True,
+    responses={401: {"model": UnauthorizedOut}},
+    tags=["feedback"],
+    dependencies=[Depends(bearer_scheme)],
+)
+def get_feedback_stats(
+    group_by: str = Query("country", pattern="^(country|admin1)$"),
+    week: date | None = Query(None, description="any date in the week (weeks start on Monday, UTC)"),
+    country: str | None = Query(None, min_length=1, max_length=50, description="group_by=admin1 only"),
+    limit: int = Query(20, ge=1, le=500),
+    _: User = Depends(get_current_read_user),
+    db: Session = Depends(get_read_db),
+) -> FeedbackStatsOut:
+    # Read from the rollup tables, never from user_feedback
+    period = week_start(week) if week is not None else None
+    if group_by == "admin1":
+        rows = fetch_admin1_feedback_stats(db, period, norm(country) if country else None, limit)
+        out = [
+            FeedbackStatsRowOut(
+                country_raw=r.country_raw,
+                admin1_raw=r.admin1_raw,
+                conflict_data_id=r.conflict_data_id,
+                feedback_count=r.feedback_count,
+                last_feedback_at=r.last_feedback_at,
+            )
+            for r in rows
+        ]
+    else:
+        rows = fetch_country_feedback_stats(db, period, limit)
+        out = [
+            FeedbackStatsRowOut(
+                country_raw=r.country_raw,
+                feedback_count=r.feedback_count,
+                last_feedback_at=r.last_feedback_at,
+            )
+            for r in rows
+        ]
+    return FeedbackStatsOut(group_by=group_by, week=period, rows=out)
+
+
 @app.delete(
     "/conflictdata",
     tags=["conflictdata"],
@@ -317,31 +661,46 @@ def delete_conflictdata(
     country_norm = norm(payload.country)
     admin1_norm = norm(payload.admin1)
 
-    # Transaction: delete + mark stale
-    with db.begin():
-        conflict = db.execute(
-            select(ConflictData).where(
-                ConflictData.country_norm == country_norm,
-                ConflictData.admin1_norm == admin1_norm,
-            )
-        ).scalar_one_or_none()
-
-        if not conflict:
-            raise HTTPException(status_code=404, detail="conflict_data row not found")
+    # Transaction: delete + risk score update + bump dataset version.
+    # The session already autobegan a transaction for the admin lookup, so a
+    # single commit at the end covers all of it; on 404 nothing was written.
+    conflict = find_conflict_row(db, country_norm, admin1_norm)
 
-        db.delete(conflict)
-
-        cache = get_or_create_cache_row(db, payload.country)
-        cache.status = STATUS_STALE
-        cache.score = None
-        cache.computed_at = None
-        cache.last_error = None
+    if not conflict:
+        raise HTTPException(status_code=404, detail="conflict_data row not found")
+
+    # Delete by id and take the values from what was actually deleted: a
+    # concurrent delete may have won (0 rows) or an import may have moved the
+    # score since the lookup. The row must be gone before the aggregate moves
+    # (see apply_current_delta).
+    deleted = db.execute(
+        delete(ConflictData)
+        .where(ConflictData.id == conflict.id)
+        .returning(ConflictData.country_id, ConflictData.admin1_id, ConflictData.score)
+        .execution_options(synchronize_session=False)
+    ).one_or_none()
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="conflict_data row not found")
+    db.expunge(conflict)
+
+    # conflict_history is left alone: it records what each week's feed said,
+    # and /history and the windowed scores keep reading it
+    remove_conflict_feedback(db, conflict.id, deleted.country_id)
+    # The deleted row may have carried the country's display spelling
+    refresh_country_names(db, [deleted.country_id])
+
+    # Current score: O(1) update of the running aggregates, ready on commit.
+    # Windowed scores only read history, so they stay valid.
+    updated = apply_current_delta(db, deleted.country_id, -deleted.score, -1)
+    if not updated:
+        get_or_create_cache_row(db, country_norm)
+
+    bump_dataset_version(db)
+    db.commit()
 
-    # After commit: enqueue compute
-    # Need a fresh DB session state for marking computing; reuse same session is OK.
-    should_compute = try_mark_computing(db, country_norm)
-    if should_compute:
-        background.add_task(compute_country_risk_score, country_norm)
+    # No aggregates yet (e.g. never computed): fall back to the full compute
+    if not updated and try_mark_computing(db, country_norm):
+        background.add_task(compute_country_risk_score, country_norm, request_id=current_request_id())
 
     logging.getLogger("app.conflictdata").info(
         "conflictdata_deleted",
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+
+log = logging.getLogger("app.db")
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the last response body byte",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while serving one request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+DB_SECONDS_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Total SQL execution time while serving one request",
+    ["route"],
+    buckets=_LATENCY_BUCKETS,
+)
+DB_SLOWEST_STATEMENT_SECONDS = Histogram(
+    "db_slowest_statement_seconds",
+    "Slowest single SQL statement of each request",
+    ["route"],
+    buckets=_LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUT_WAIT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    ["pool"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections open beyond pool_size (negative while the pool is still filling)",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+
+
+@dataclass
+class RequestDbStats:
+    query_count: int = 0
+    db_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: Optional[str] = None
+
+
+# Set per request by MetricsMiddleware. Threadpool endpoints/dependencies run in a
+# copy of the context, so they see (and mutate) the same stats object.
+_request_db_stats: ContextVar[Optional[RequestDbStats]] = ContextVar("request_db_stats", default=None)
+
+
+def current_db_stats() -> Optional[RequestDbStats]:
+    return _request_db_stats.get()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records checkout wait and pool occupancy.
+    The metrics label is the pool's logging name (create_engine(pool_logging_name=...)),
+    which survives recreate() after a disconnect.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT_SECONDS.labels(self._label).observe(time.perf_counter() - start)
+            self._update_gauges()
+
+    def _do_return_conn(self, record) -> None:
+        try:
+            super()._do_return_conn(record)
+        finally:
+            self._update_gauges()
+
+    @property
+    def _label(self) -> str:
+        return self.logging_name or "default"
+
+    def _update_gauges(self) -> None:
+        DB_POOL_CHECKED_OUT.labels(self._label).set(self.checkedout())
+        DB_POOL_OVERFLOW.labels(self._label).set(self.overflow())
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+
+    stats = _request_db_stats.get()
+    if stats is not None:
+        stats.query_count += 1
+        stats.db_seconds += elapsed
+        if elapsed > stats.slowest_seconds:
+            stats.slowest_seconds = elapsed
+            stats.slowest_statement = statement
+
+    if elapsed * 1000 >= settings.DB_SLOW_STATEMENT_MS:
+        # Statement text only; parameters may carry user data
+        log.warning("slow_statement", extra={"duration_ms": round(elapsed * 1000, 1), "statement": statement[:500]})
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware body buffering).
+    Latency is observed when the last body chunk is sent, so background tasks
+    that run after the response are not counted against the request.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDbStats()
+        token = _request_db_stats.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+        observed = False
+
+        def observe() -> None:
+            nonlocal observed
+            observed = True
+            route = scope.get("route")
+            # Templated path keeps label cardinality bounded
+            route_label = getattr(route, "path", "unmatched")
+            HTTP_REQUEST_SECONDS.labels(scope["method"], route_label, str(status_code)).observe(
+                time.perf_counter() - start
+            )
+            DB_QUERIES_PER_REQUEST.labels(route_label).observe(stats.query_count)
+            DB_SECONDS_PER_REQUEST.labels(route_label).observe(stats.db_seconds)
+            DB_SLOWEST_STATEMENT_SECONDS.labels(route_label).observe(stats.slowest_seconds)
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) and not observed:
+                observe()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not observed:
+                observe()
+            _request_db_stats.reset(token)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    # Under gunicorn (see gunicorn.conf.py) each worker writes to PROMETHEUS_MULTIPROC_DIR;
+    # aggregate all of them so any worker can answer the scrape.
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Optional
 
 from sqlalchemy import (
     BigInteger,
     CheckConstraint,
+    Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -30,26 +32,108 @@ class User(Base):
     role: Mapped[str] = mapped_column(String(20), nullable=False, default="user")
 
 
+class Country(Base):
+    """Country dimension; facts reference it by integer id instead of repeating names."""
+
+    __tablename__ = "countries"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name_norm: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
+    # Display name: the smallest raw spelling seen, matching the old min(country_raw)
+    name_raw: Mapped[str] = mapped_column(String(50), nullable=False)
+
+
+class Admin1Region(Base):
+    __tablename__ = "admin1_regions"
+    __table_args__ = (
+        # Unique key doubling as a covering index: per-country admin1 lists are index-only
+        Index(
+            "uq_admin1_country_name_norm",
+            "country_id",
+            "name_norm",
+            unique=True,
+            postgresql_include=["id", "name_raw"],
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    country_id: Mapped[int] = mapped_column(ForeignKey("countries.id"), nullable=False)
+    name_norm: Mapped[str] = mapped_column(String(50), nullable=False)
+    # Raw spelling from the newest week imported so far
+    name_raw: Mapped[str] = mapped_column(String(50), nullable=False)
+    # The country's spelling on that same row; countries.name_raw is the
+    # smallest of these over the country's current rows
+    country_name_raw: Mapped[str] = mapped_column(String(50), nullable=False)
+    # Week the two spellings come from; re-importing an older week keeps them
+    name_period_start: Mapped[date] = mapped_column(Date, nullable=False)
+
+
 class ConflictData(Base):
     __tablename__ = "conflict_data"
     __table_args__ = (
-        UniqueConstraint("country_norm", "admin1_norm", name="uq_conflict_country_admin1_norm"),
         CheckConstraint("events >= 0", name="ck_conflict_events_nonneg"),
+        # Covers the per-country row listing and the risk AVG (index-only scans)
+        Index(
+            "ix_conflict_data_country_cover",
+            "country_id",
+            postgresql_include=["admin1_id", "population", "events", "score"],
+        ),
+        # One row per admin1; also covers joins that probe by admin1_id
+        Index(
+            "conflict_data_admin1_id_key",
+            "admin1_id",
+            unique=True,
+            postgresql_include=["country_id", "population", "events", "score"],
+        ),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
-    country_raw: Mapped[str] = mapped_column(String(50), nullable=False)
-    country_norm: Mapped[str] = mapped_column(String(50), index=True, nullable=False)
-
-    admin1_raw: Mapped[str] = mapped_column(String(50), nullable=False)
-    admin1_norm: Mapped[str] = mapped_column(String(50), index=True, nullable=False)
+    # country_id is implied by admin1_id; kept so per-country scans need no join
+    country_id: Mapped[int] = mapped_column(ForeignKey("countries.id"), nullable=False)
+    admin1_id: Mapped[int] = mapped_column(ForeignKey("admin1_regions.id"), nullable=False)
 
     population: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
     events: Mapped[int] = mapped_column(Integer, nullable=False)
     score: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False)
 
-    feedback: Mapped[list["UserFeedback"]] = relationship(back_populates="conflict_data")
+    # Week (Monday) of the observation currently held for this admin1; the full
+    # series lives in conflict_history
+    period_start: Mapped[date] = mapped_column(Date, nullable=False)
+
+    # ON DELETE CASCADE does the work; without passive_deletes the ORM would load
+    # the feedback and try to NULL its (non-nullable) conflict_data_id
+    feedback: Mapped[list["UserFeedback"]] = relationship(back_populates="conflict_data", passive_deletes=True)
+
+
+class ConflictHistory(Base):
+    """
+    Weekly observations, one row per (admin1, period_start).
+    Range-partitioned by month on period_start (partitions are created on import,
+    see app.history), so windowed queries only scan the months they cover.
+    """
+
+    __tablename__ = "conflict_history"
+    __table_args__ = (
+        # Covers windowed history reads and AVGs (index-only scans)
+        Index(
+            "ix_conflict_history_country_period",
+            "country_id",
+            "period_start",
+            postgresql_include=["admin1_id", "population", "events", "score"],
+        ),
+        CheckConstraint("events >= 0", name="ck_conflict_history_events_nonneg"),
+        {"postgresql_partition_by": "RANGE (period_start)"},
+    )
+
+    # Leading period_start also makes max(period_start) an index lookup per partition
+    period_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    admin1_id: Mapped[int] = mapped_column(ForeignKey("admin1_regions.id"), primary_key=True)
+    country_id: Mapped[int] = mapped_column(ForeignKey("countries.id"), nullable=False)
+
+    population: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    events: Mapped[int] = mapped_column(Integer, nullable=False)
+    score: Mapped[Decimal] = mapped_column(Numeric(12, 4), nullable=False)
 
 
 class UserFeedback(Base):
@@ -69,12 +153,63 @@ class UserFeedback(Base):
     conflict_data: Mapped["ConflictData"] = relationship(back_populates="feedback")
 
 
+class FeedbackAdmin1Stats(Base):
+    """
+    Rollup of user_feedback per conflict_data row, maintained in the same
+    transaction as each feedback insert (app.feedback_stats).
+    conflict_data_id has no foreign key: the admin delete removes these rows
+    itself, after the conflict_data row, so it takes locks in the same order
+    as a feedback insert.
+    """
+
+    __tablename__ = "feedback_admin1_stats"
+    __table_args__ = (
+        # Top-N regions overall and within a country, without sorting
+        Index("ix_feedback_admin1_stats_count", "feedback_count"),
+        Index("ix_feedback_admin1_stats_country_count", "country_id", "feedback_count"),
+    )
+
+    conflict_data_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    country_id: Mapped[int] = mapped_column(ForeignKey("countries.id"), nullable=False)
+    feedback_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    last_feedback_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class FeedbackAdmin1WeeklyStats(Base):
+    """Same rollup per week (period_start, a Monday, UTC)."""
+
+    __tablename__ = "feedback_admin1_weekly_stats"
+    __table_args__ = (
+        Index("ix_feedback_admin1_weekly_count", "period_start", "feedback_count"),
+        Index("ix_feedback_admin1_weekly_country", "period_start", "country_id", "feedback_count"),
+    )
+
+    period_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    conflict_data_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    country_id: Mapped[int] = mapped_column(ForeignKey("countries.id"), nullable=False)
+    feedback_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    last_feedback_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class FeedbackCountryStats(Base):
+    """Rollup of user_feedback per country."""
+
+    __tablename__ = "feedback_country_stats"
+    __table_args__ = (Index("ix_feedback_country_stats_count", "feedback_count"),)
+
+    country_id: Mapped[int] = mapped_column(ForeignKey("countries.id"), primary_key=True)
+    feedback_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    last_feedback_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
 class RiskScoreCache(Base):
     __tablename__ = "risk_score_cache"
-    __table_args__ = (UniqueConstraint("country_norm", name="uq_risk_country_norm"),)
+    __table_args__ = (UniqueConstraint("country_id", "window_weeks", name="uq_risk_country_window"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    country_norm: Mapped[str] = mapped_column(String(50), nullable=False)
+    country_id: Mapped[int] = mapped_column(ForeignKey("countries.id"), nullable=False)
+    # 0 = current data (conflict_data); N = the last N weeks of conflict_history
+    window_weeks: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
 
     # keep as text for now (computing/ready/failed/stale). We'll treat as enum-in-code.
     status: Mapped[str] = mapped_column(String(20), nullable=False)
@@ -82,3 +217,27 @@ class RiskScoreCache(Base):
     score: Mapped[Optional[Decimal]] = mapped_column(Numeric(12, 4), nullable=True)
     computed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Bumped on every invalidation; a job only stores its result if the
+    # generation it read its data under is still current
+    generation: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+
+    # Running aggregates of the current window (window_weeks=0 only), moved in the
+    # same transaction as each conflict_data change; score = score_sum / row_count.
+    # NULL until the first full compute.
+    score_sum: Mapped[Optional[Decimal]] = mapped_column(Numeric(20, 4), nullable=True)
+    row_count: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+
+
+class DatasetVersion(Base):
+    """
+    Single-row counter bumped in the same transaction as every change to conflict_data.
+    Derived artifacts (snapshots, cached responses) are keyed on it.
+    """
+
+    __tablename__ = "dataset_version"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=1)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+from app.http_compression import EncodedBody
+from app.shared_cache import SharedResponseStore
+
+
+class ResponseCache:
+    """
+    In-process LRU of encoded response bodies, keyed by (dataset_version, key).
+    Entries from older dataset versions are never served and are dropped as soon
+    as a newer version is stored.
+    With a shared store, local misses fall through to it and puts go to both,
+    so a body serialized by one worker is served by all of them.
+    """
+
+    def __init__(self, max_entries: int, shared: Optional[SharedResponseStore] = None) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[int, str], EncodedBody] = OrderedDict()
+        self._version = 0
+        self._lock = threading.Lock()
+        self._shared = shared
+
+    def get(self, version: int, key: str) -> Optional[EncodedBody]:
+        with self._lock:
+            body = self._entries.get((version, key))
+            if body is not None:
+                self._entries.move_to_end((version, key))
+                return body
+        if self._shared is None:
+            return None
+        body = self._shared.get(version, key)
+        if body is not None:
+            self._put_local(version, key, body)
+        return body
+
+    def put(self, version: int, key: str, body: EncodedBody) -> None:
+        if self._put_local(version, key, body) and self._shared is not None:
+            self._shared.put(version, key, body)
+
+    def _put_local(self, version: int, key: str, body: EncodedBody) -> bool:
+        with self._lock:
+            if version < self._version:
+                # Computed from an older dataset version than what we've already seen
+                return False
+            if version > self._version:
+                self._entries.clear()
+                self._version = version
+
+            self._entries[(version, key)] = body
+            self._entries.move_to_end((version, key))
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self._shared is not None:
+            self._shared.clear()
+
+
+response_cache = ResponseCache(
+    settings.RESPONSE_CACHE_MAX_ENTRIES,
+    SharedResponseStore(Path(settings.SHARED_CACHE_DIR), settings.SHARED_CACHE_MAX_BYTES)
+    if settings.SHARED_CACHE_DIR
+    else None,
+)
@@ -1,58 +1,129 @@
 from __future__ import annotations
 
+import logging
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Optional
+from typing import Iterable, Optional
 
-from sqlalchemy import select, update
+from sqlalchemy import bindparam, case, func, literal, select, text, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.advisory_locks import LOCK_NS_RISK_COMPUTE, risk_compute_lock_key
 from app.core.normalize import norm
-from app.models import RiskScoreCache
+from app.dataset_version import bump_dataset_version
+from app.dimensions import country_id_subquery
+from app.models import Country, RiskScoreCache
 from sqlalchemy.dialects.postgresql import insert
 
+log = logging.getLogger("app.riskscore")
+
 STATUS_COMPUTING = "computing"
 STATUS_READY = "ready"
 STATUS_FAILED = "failed"
 STATUS_STALE = "stale"
 
+# window_weeks value for scores over the current data (conflict_data)
+WINDOW_CURRENT = 0
+
+
+def _row_filter(country_norm: str, window_weeks: int):
+    return (
+        RiskScoreCache.country_id == country_id_subquery(country_norm),
+        RiskScoreCache.window_weeks == window_weeks,
+    )
+
 
-def reset_computing_to_failed_on_startup(db: Session) -> int:
+def reset_orphaned_computing_to_failed(db: Session) -> int:
+    """
+    Marks orphaned 'computing' rows failed so the next poll re-enqueues them.
+    Rows whose compute lock is held belong to a live job (in any worker) and are left alone;
+    the locks taken here are transaction-scoped and released by the commit.
+    """
+    # MATERIALIZED: the status filter must run before the lock probe, or
+    # Postgres may take compute locks for rows that aren't computing
+    computing = (
+        select(RiskScoreCache.id, RiskScoreCache.country_id, RiskScoreCache.window_weeks)
+        .where(RiskScoreCache.status == STATUS_COMPUTING)
+        .cte("computing")
+        .prefix_with("MATERIALIZED")
+    )
+    orphaned = select(computing.c.id).where(
+        func.pg_try_advisory_xact_lock(
+            LOCK_NS_RISK_COMPUTE,
+            risk_compute_lock_key(computing.c.country_id, computing.c.window_weeks),
+        )
+    )
     res = db.execute(
         update(RiskScoreCache)
-        .where(RiskScoreCache.status == STATUS_COMPUTING)
-        .values(status=STATUS_FAILED, last_error="startup reset from computing")
+        .where(RiskScoreCache.id.in_(orphaned), RiskScoreCache.status == STATUS_COMPUTING)
+        .values(status=STATUS_FAILED, last_error="reset from orphaned computing")
+        .execution_options(synchronize_session=False)
     )
     db.commit()
     return int(res.rowcount or 0)
 
 
-def get_or_create_cache_row(db: Session, country_norm: str) -> RiskScoreCache:
+def mark_windows_stale(db: Session, country_norm: Optional[str] = None) -> None:
+    """
+    Invalidates the history windows (window_weeks > 0) of one country (all
+    countries if None) inside the caller's transaction (no commit here).
+    The current window is kept up to date by its running aggregates instead.
+    """
+    stmt = update(RiskScoreCache).where(RiskScoreCache.window_weeks != WINDOW_CURRENT)
+    if country_norm is not None:
+        stmt = stmt.where(RiskScoreCache.country_id == country_id_subquery(country_norm))
+    db.execute(
+        stmt.values(
+            status=STATUS_STALE,
+            score=None,
+            computed_at=None,
+            last_error=None,
+            generation=RiskScoreCache.generation + 1,
+        ).execution_options(synchronize_session=False)
+    )
+
+
+def get_or_create_cache_row(db: Session, country_norm: str, window_weeks: int = WINDOW_CURRENT) -> RiskScoreCache:
     """
     Given a normalized country, ensures a cache row exists and returns it.
+    The country must exist (callers 404 first), otherwise country_id would be NULL.
     Uses a fast/non-locking ON CONFLICT DO NOTHING to avoid race conditions.
     """
     stmt = (
         insert(RiskScoreCache)
-        .values(country_norm=country_norm, status=STATUS_STALE)
-        .on_conflict_do_nothing(index_elements=[RiskScoreCache.country_norm])
+        .values(country_id=country_id_subquery(country_norm), window_weeks=window_weeks, status=STATUS_STALE)
+        .on_conflict_do_nothing(index_elements=[RiskScoreCache.country_id, RiskScoreCache.window_weeks])
     )
     db.execute(stmt)
 
     return db.execute(
-        select(RiskScoreCache).where(RiskScoreCache.country_norm == country_norm)
+        select(RiskScoreCache).where(*_row_filter(country_norm, window_weeks))
     ).scalar_one()
 
 
 
-def try_mark_computing(db: Session, country_norm: str) -> bool:
+def get_ready_score(db: Session, country_norm: str, window_weeks: int = WINDOW_CURRENT) -> Optional[Decimal]:
+    """
+    Returns the cached score if it is ready, without creating a row.
+    Selects columns rather than the entity so nothing lands in the identity map:
+    a later get_or_create_cache_row on the primary must not see replica state.
+    """
+    row = db.execute(
+        select(RiskScoreCache.status, RiskScoreCache.score).where(*_row_filter(country_norm, window_weeks))
+    ).one_or_none()
+    if row is None or row.status != STATUS_READY:
+        return None
+    return row.score
+
+
+def try_mark_computing(db: Session, country_norm: str, window_weeks: int = WINDOW_CURRENT) -> bool:
     """
     Returns True if we transitioned into 'computing' (meaning caller should compute),
     False if it was already computing.
     """
     row = db.execute(
-        select(RiskScoreCache).where(RiskScoreCache.country_norm == country_norm)
+        select(RiskScoreCache).where(*_row_filter(country_norm, window_weeks))
     ).scalar_one()
 
     if row.status == STATUS_COMPUTING:
@@ -64,21 +135,189 @@ def try_mark_computing(db: Session, country_norm: str) -> bool:
     return True
 
 
-def mark_ready(db: Session, country_norm: str, score: Decimal) -> None:
-    row = db.execute(
-        select(RiskScoreCache).where(RiskScoreCache.country_norm == country_norm)
-    ).scalar_one()
-    row.status = STATUS_READY
-    row.score = score
-    row.computed_at = datetime.now(timezone.utc)
-    row.last_error = None
+def get_generation(db: Session, country_norm: str, window_weeks: int = WINDOW_CURRENT) -> Optional[int]:
+    return db.execute(
+        select(RiskScoreCache.generation).where(*_row_filter(country_norm, window_weeks))
+    ).scalar_one_or_none()
+
+
+def _finish_compute(db: Session, country_norm: str, window_weeks: int, generation: Optional[int], **values) -> bool:
+    """
+    Stores a job's outcome only if the row is still 'computing' and (when given)
+    still at the generation the job read its data under. Returns whether it did.
+    """
+    stmt = update(RiskScoreCache).where(
+        *_row_filter(country_norm, window_weeks), RiskScoreCache.status == STATUS_COMPUTING
+    )
+    if generation is not None:
+        stmt = stmt.where(RiskScoreCache.generation == generation)
+    res = db.execute(stmt.values(**values).execution_options(synchronize_session=False))
     db.commit()
+    return bool(res.rowcount)
 
 
-def mark_failed(db: Session, country_norm: str, err: str) -> None:
-    row = db.execute(
-        select(RiskScoreCache).where(RiskScoreCache.country_norm == country_norm)
-    ).scalar_one()
-    row.status = STATUS_FAILED
-    row.last_error = err[:2000]
+def mark_ready(
+    db: Session,
+    country_norm: str,
+    score: Decimal,
+    window_weeks: int = WINDOW_CURRENT,
+    generation: Optional[int] = None,
+) -> bool:
+    return _finish_compute(
+        db,
+        country_norm,
+        window_weeks,
+        generation,
+        status=STATUS_READY,
+        score=score,
+        computed_at=datetime.now(timezone.utc),
+        last_error=None,
+    )
+
+
+def mark_failed(
+    db: Session,
+    country_norm: str,
+    err: str,
+    window_weeks: int = WINDOW_CURRENT,
+    generation: Optional[int] = None,
+) -> bool:
+    return _finish_compute(
+        db, country_norm, window_weeks, generation, status=STATUS_FAILED, last_error=err[:2000]
+    )
+
+
+def apply_current_delta(db: Session, country_id: int, score_delta: Decimal, count_delta: int) -> bool:
+    """
+    Moves the country's current-window aggregates by one row's change and
+    re-derives the score, inside the caller's transaction (no commit here).
+    Run it after the conflict_data change itself: the row lock it takes is what
+    orders it against refresh_current_aggregates.
+    Returns False if the country has no aggregates yet (caller falls back to a
+    full compute).
+    """
+    new_count = RiskScoreCache.row_count + count_delta
+    new_sum = RiskScoreCache.score_sum + score_delta
+    res = db.execute(
+        update(RiskScoreCache)
+        .where(
+            RiskScoreCache.country_id == country_id,
+            RiskScoreCache.window_weeks == WINDOW_CURRENT,
+            RiskScoreCache.row_count.is_not(None),
+        )
+        .values(
+            score_sum=new_sum,
+            row_count=new_count,
+            score=case((new_count > 0, new_sum / new_count)),
+            status=case((new_count > 0, STATUS_READY), else_=STATUS_FAILED),
+            last_error=case((new_count > 0, None), else_="no rows for country"),
+            computed_at=func.now(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return bool(res.rowcount)
+
+
+# score_sum/row_count straight from conflict_data; LATERAL keeps it one
+# index-only aggregate per country
+_REFRESH_CURRENT_SQL = text(
+    """
+    UPDATE risk_score_cache r
+    SET score_sum = a.score_sum,
+        row_count = a.row_count,
+        score = CASE WHEN a.row_count > 0 THEN a.score_sum / a.row_count END,
+        status = CASE WHEN a.row_count > 0 THEN :ready ELSE :failed END,
+        last_error = CASE WHEN a.row_count > 0 THEN NULL ELSE 'no rows for country' END,
+        computed_at = now()
+    FROM risk_score_cache c
+    CROSS JOIN LATERAL (
+        SELECT coalesce(sum(d.score), 0) AS score_sum, count(*) AS row_count
+        FROM conflict_data d
+        WHERE d.country_id = c.country_id
+    ) a
+    WHERE r.id = c.id AND c.window_weeks = 0 AND c.country_id IN :country_ids
+    RETURNING r.country_id, r.score_sum, r.row_count
+    """
+).bindparams(bindparam("country_ids", expanding=True))
+
+
+def refresh_current_aggregates(db: Session, country_ids: Iterable[int], check_drift: bool = True) -> int:
+    """
+    Recomputes the current-window aggregates of the given countries from
+    conflict_data (creating their cache rows if needed) and marks them ready,
+    inside the caller's transaction (no commit here).
+
+    The cache rows are locked before conflict_data is read, so a concurrent
+    delete either committed first (and is seen by the aggregate) or applies
+    its delta on top of ours afterwards. Rows whose stored aggregates differ
+    from the recomputed ones are logged as drift; returns how many there were.
+    Correcting drift bumps the dataset version, so cached riskscore bodies
+    built from the wrong aggregates are no longer served. Writers that just
+    changed conflict_data pass check_drift=False: their differences are expected.
+    """
+    ids = sorted(set(country_ids))
+    if not ids:
+        return 0
+
+    db.execute(
+        insert(RiskScoreCache)
+        .from_select(
+            ["country_id", "window_weeks", "status"],
+            select(Country.id, literal(WINDOW_CURRENT), literal(STATUS_STALE)).where(Country.id.in_(ids)),
+        )
+        .on_conflict_do_nothing(index_elements=[RiskScoreCache.country_id, RiskScoreCache.window_weeks])
+    )
+    before = {
+        cid: (score_sum, row_count)
+        for cid, score_sum, row_count in db.execute(
+            select(RiskScoreCache.country_id, RiskScoreCache.score_sum, RiskScoreCache.row_count)
+            .where(RiskScoreCache.country_id.in_(ids), RiskScoreCache.window_weeks == WINDOW_CURRENT)
+            .order_by(RiskScoreCache.country_id)
+            .with_for_update()
+        )
+    }
+    after = db.execute(
+        _REFRESH_CURRENT_SQL, {"country_ids": ids, "ready": STATUS_READY, "failed": STATUS_FAILED}
+    ).all()
+
+    if not check_drift:
+        return 0
+
+    drifted = 0
+    for cid, score_sum, row_count in after:
+        old_sum, old_count = before.get(cid, (None, None))
+        if old_count is not None and (old_sum, old_count) != (score_sum, row_count):
+            drifted += 1
+            log.warning(
+                "risk_aggregate_drift",
+                extra={
+                    "country_id": cid,
+                    "stored_sum": old_sum,
+                    "stored_count": old_count,
+                    "actual_sum": score_sum,
+                    "actual_count": row_count,
+                },
+            )
+    if drifted:
+        bump_dataset_version(db)
+    return drifted
+
+
+def verify_current_aggregates(db: Session) -> int:
+    """
+    Consistency check: rebuilds every country's running aggregates from
+    conflict_data, one country per transaction so writers are only held up
+    briefly. Returns the number of countries that had drifted.
+    """
+    country_ids = db.execute(
+        select(RiskScoreCache.country_id)
+        .where(RiskScoreCache.window_weeks == WINDOW_CURRENT, RiskScoreCache.row_count.is_not(None))
+        .order_by(RiskScoreCache.country_id)
+    ).scalars().all()
     db.commit()
+
+    drifted = 0
+    for country_id in country_ids:
+        drifted += refresh_current_aggregates(db, [country_id])
+        db.commit()
+    return drifted
@@ -1,43 +1,102 @@
 from __future__ import annotations
 
 import logging
+from datetime import date
 from decimal import Decimal
+from typing import Optional
 
 from sqlalchemy import select, func
 from sqlalchemy.orm import Session
 
+from app.advisory_locks import lock_risk_compute
 from app.db import SessionLocal
-from app.models import ConflictData
-from app.risk_cache import mark_failed, mark_ready
+from app.dimensions import country_id_subquery, get_country_id
+from app.history import window_start
+from app.models import ConflictData, ConflictHistory
+from app.risk_cache import WINDOW_CURRENT, get_generation, mark_failed, mark_ready, refresh_current_aggregates
+from app.tracing import bind_request_id
 
 log = logging.getLogger("app.riskscore")
 
 
-def compute_country_risk_score(country_norm: str) -> None:
+def current_avg_query(country_norm: str):
+    # Same index-only access path as the per-country aggregate in refresh_current_aggregates
+    return select(func.avg(ConflictData.score)).where(ConflictData.country_id == country_id_subquery(country_norm))
+
+
+def window_avg_query(country_norm: str, since: date):
+    # period_start bound -> only the partitions inside the window are scanned
+    return select(func.avg(ConflictHistory.score)).where(
+        ConflictHistory.country_id == country_id_subquery(country_norm),
+        ConflictHistory.period_start >= since,
+    )
+
+
+def _window_avg_score(db: Session, country_norm: str, window_weeks: int):
+    since = window_start(db, window_weeks)
+    if since is None:
+        return None
+    return db.execute(window_avg_query(country_norm, since)).scalar_one_or_none()
+
+
+def compute_country_risk_score(
+    country_norm: str,
+    window_weeks: int = WINDOW_CURRENT,
+    request_id: Optional[str] = None,
+) -> None:
     """
     Runs in background. Must not raise.
+    window_weeks=0 rebuilds the current data's running aggregates (normally kept
+    up to date by the writers; this is the fallback and consistency check);
+    N>0 scores the last N weeks of history.
+    request_id (of the request that enqueued the job) tags the job's log records.
     """
-    log.info("starting risk score compute", extra={"country_norm": country_norm})
+    with bind_request_id(request_id):
+        _compute(country_norm, window_weeks)
+
+
+def _compute(country_norm: str, window_weeks: int) -> None:
+    ctx = {"country_norm": country_norm, "window_weeks": window_weeks}
+    log.info("starting risk score compute", extra=ctx)
     db: Session = SessionLocal()
+    generation = None
     try:
-        log.info("querying for avg score", extra={"country_norm": country_norm})
-        avg_score = db.execute(
-            select(func.avg(ConflictData.score)).where(ConflictData.country_norm == country_norm)
-        ).scalar_one_or_none()
-        log.info("got avg score", extra={"country_norm": country_norm, "avg_score": avg_score})
+        # Held until mark_ready/mark_failed commits; tells other workers (and the
+        # orphaned-job reset) that this job is alive
+        lock_risk_compute(db, country_id_subquery(country_norm), window_weeks)
+        # Read before the data: a change committed after this point bumps the
+        # generation, and our (then outdated) result is discarded
+        generation = get_generation(db, country_norm, window_weeks)
+
+        if window_weeks == WINDOW_CURRENT:
+            country_id = get_country_id(db, country_norm)
+            if country_id is None:
+                mark_failed(db, country_norm, "no rows for country", window_weeks, generation)
+                return
+            refresh_current_aggregates(db, [country_id])
+            db.commit()
+            log.info("risk score compute complete", extra=ctx)
+            return
+
+        log.info("querying for avg score", extra=ctx)
+        avg_score = _window_avg_score(db, country_norm, window_weeks)
+        log.info("got avg score", extra={**ctx, "avg_score": avg_score})
 
         if avg_score is None:
-            mark_failed(db, country_norm, "no rows for country")
+            mark_failed(db, country_norm, "no rows for country", window_weeks, generation)
             return
 
         score = avg_score if isinstance(avg_score, Decimal) else Decimal(str(avg_score))
-        mark_ready(db, country_norm, score)
-        log.info("risk score compute complete", extra={"country_norm": country_norm})
+        if mark_ready(db, country_norm, score, window_weeks, generation):
+            log.info("risk score compute complete", extra=ctx)
+        else:
+            log.info("risk score result discarded (data changed during compute)", extra=ctx)
     except Exception as e:
-        log.exception("risk score compute failed", extra={"country_norm": country_norm})
+        log.exception("risk score compute failed", extra=ctx)
         try:
-            mark_failed(db, country_norm, str(e))
+            db.rollback()
+            mark_failed(db, country_norm, str(e), window_weeks, generation)
         except Exception:
-            log.exception("failed to mark failed", extra={"country_norm": country_norm})
+            log.exception("failed to mark failed", extra=ctx)
     finally:
         db.close()
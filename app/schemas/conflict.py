@@ -1,3 +1,4 @@
+from datetime import date
 from decimal import Decimal
 from typing import Optional
 
@@ -11,6 +12,14 @@ class ConflictRowOut(BaseModel):
     score: Decimal
 
 
+class ConflictHistoryRowOut(BaseModel):
+    period_start: date
+    admin1_raw: str
+    population: Optional[int] = None
+    events: int = Field(ge=0)
+    score: Decimal
+
+
 class ConflictCountryGroupOut(BaseModel):
     country_raw: str
     rows: list[ConflictRowOut]
@@ -20,3 +29,18 @@ class ConflictDataPageOut(BaseModel):
     page: int
     per_page: int
     countries: list[ConflictCountryGroupOut]
+
+
+# Upper bound for one multi-country fetch
+MAX_SELECTED_COUNTRIES = 100
+
+
+class ConflictCountriesIn(BaseModel):
+    countries: list[str] = Field(min_length=1, max_length=MAX_SELECTED_COUNTRIES)
+
+
+class ConflictCountrySelectionOut(BaseModel):
+    # In request order; duplicates (after normalization) appear once
+    countries: list[ConflictCountryGroupOut]
+    # Requested names without conflict data, as sent
+    unknown: list[str]
@@ -1,3 +1,6 @@
+from datetime import date, datetime
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
 
@@ -9,3 +12,19 @@ class FeedbackIn(BaseModel):
 class FeedbackOut(BaseModel):
     id: int
     conflict_data_id: int
+
+
+class FeedbackStatsRowOut(BaseModel):
+    country_raw: str
+    # Only set for group_by=admin1
+    admin1_raw: Optional[str] = None
+    conflict_data_id: Optional[int] = None
+    feedback_count: int
+    last_feedback_at: datetime
+
+
+class FeedbackStatsOut(BaseModel):
+    group_by: str
+    # Monday of the requested week; absent for all-time stats
+    week: Optional[date] = None
+    rows: list[FeedbackStatsRowOut]
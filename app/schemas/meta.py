@@ -1,5 +1,15 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 
 class HealthOut(BaseModel):
     status: str
+
+
+class ReadyOut(BaseModel):
+    status: str
+    phase: str
+    elapsed_seconds: float
+    rows_parsed: int = 0
+    error: Optional[str] = None
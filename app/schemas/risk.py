@@ -1,10 +1,14 @@
 from decimal import Decimal
+from typing import Optional
+
 from pydantic import BaseModel
 
 
 class RiskScoreOut(BaseModel):
     country_norm: str
     score: Decimal
+    # Only present for ?weeks= requests
+    window_weeks: Optional[int] = None
 
 class CalculatingOut(BaseModel):
     detail: str
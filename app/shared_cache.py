@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import shutil
+import stat
+import struct
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from app.http_compression import EncodedBody
+
+log = logging.getLogger("app.shared_cache")
+
+# magic, identity length, gzip length, br length (-1 = variant not stored)
+_HEADER = struct.Struct("!4sqqq")
+_MAGIC = b"ACB1"
+
+
+def _pack(body: EncodedBody) -> bytes:
+    gz, br = body.gzip, body.br
+    header = _HEADER.pack(
+        _MAGIC,
+        len(body.identity),
+        -1 if gz is None else len(gz),
+        -1 if br is None else len(br),
+    )
+    return b"".join((header, body.identity, gz or b"", br or b""))
+
+
+def _unpack(data: bytes) -> Optional[EncodedBody]:
+    if len(data) < _HEADER.size:
+        return None
+    magic, n_identity, n_gzip, n_br = _HEADER.unpack_from(data)
+    if magic != _MAGIC or _HEADER.size + n_identity + max(n_gzip, 0) + max(n_br, 0) != len(data):
+        return None
+    view = memoryview(data)
+    pos = _HEADER.size
+    identity = bytes(view[pos : pos + n_identity])
+    pos += n_identity
+    gz = None if n_gzip < 0 else bytes(view[pos : pos + n_gzip])
+    pos += max(n_gzip, 0)
+    br = None if n_br < 0 else bytes(view[pos : pos + n_br])
+    return EncodedBody(identity=identity, gzip=gz, br=br)
+
+
+def claim_private_dir(root: Path) -> bool:
+    """
+    Creates root with mode 0700 if missing and checks it is a real directory
+    owned by this user and closed to everyone else. /dev/shm is world-writable:
+    a directory planted there by another user could feed us forged bodies.
+    """
+    try:
+        root.mkdir(mode=0o700, exist_ok=True)
+        st = os.lstat(root)
+    except OSError as e:
+        log.warning("shared cache disabled", extra={"path": str(root), "error": str(e)})
+        return False
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        log.warning(
+            "shared cache disabled: directory not private to this user",
+            extra={"path": str(root), "uid": st.st_uid, "mode": oct(stat.S_IMODE(st.st_mode))},
+        )
+        return False
+    return True
+
+
+class SharedResponseStore:
+    """
+    Node-local store of encoded response bodies shared by every worker process:
+    one file per (dataset_version, key) under root, meant to sit on tmpfs
+    (/dev/shm), so reads are a page-cache copy rather than a DB round trip.
+
+    Files are published with an atomic rename, so readers never see a partial
+    body. All entries of a version live in one directory; the first put for a
+    newer version removes the older directories. Invalidation therefore
+    follows the dataset version bump, like the in-process cache.
+    Best effort: any OS error (full tmpfs, races with pruning) is a miss.
+    The root must be private to this user (claim_private_dir); otherwise the
+    store stays disabled and every get is a miss.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.enabled = claim_private_dir(root)
+
+    def _version_dir(self, version: int) -> Path:
+        return self.root / f"v{version}"
+
+    def _path(self, version: int, key: str) -> Path:
+        # Keys embed user input (country names); hashing keeps them path-safe
+        return self._version_dir(version) / hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, version: int, key: str) -> Optional[EncodedBody]:
+        if not self.enabled:
+            return None
+        try:
+            data = self._path(version, key).read_bytes()
+        except OSError:
+            return None
+        return _unpack(data)
+
+    def put(self, version: int, key: str, body: EncodedBody) -> None:
+        if not self.enabled:
+            return
+        data = _pack(body)
+        vdir = self._version_dir(version)
+        try:
+            if not vdir.is_dir():
+                if self._has_newer_version(version):
+                    return
+                # No parents=True: the checked root is never recreated here
+                vdir.mkdir(mode=0o700, exist_ok=True)
+                self._prune_older_versions(version)
+            if self._used_bytes(vdir) + len(data) > self.max_bytes:
+                return
+
+            fd, tmp = tempfile.mkstemp(dir=vdir, prefix=".w-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, self._path(version, key))
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            log.debug("shared cache put skipped", extra={"key": key, "error": str(e)})
+
+    def clear(self) -> None:
+        # Keeps the (checked) root itself
+        for v in self._versions():
+            shutil.rmtree(self._version_dir(v), ignore_errors=True)
+
+    def _versions(self) -> list[int]:
+        versions = []
+        for p in self.root.glob("v*"):
+            try:
+                versions.append(int(p.name[1:]))
+            except ValueError:
+                continue
+        return versions
+
+    def _has_newer_version(self, version: int) -> bool:
+        return any(v > version for v in self._versions())
+
+    def _prune_older_versions(self, version: int) -> None:
+        for v in self._versions():
+            if v < version:
+                shutil.rmtree(self._version_dir(v), ignore_errors=True)
+
+    @staticmethod
+    def _used_bytes(vdir: Path) -> int:
+        # Only walked on puts (cache misses); a version holds at most a few thousand keys
+        total = 0
+        with os.scandir(vdir) as it:
+            for entry in it:
+                try:
+                    total += entry.stat().st_size
+                except OSError:
+                    continue
+        return total
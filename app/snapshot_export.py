@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.dataset_version import get_dataset_version
+from app.http_compression import gzip_file
+from app.db import ReadSessionLocal, SessionLocal
+from app.models import Admin1Region, ConflictData, Country, RiskScoreCache
+from app.risk_cache import STATUS_READY, WINDOW_CURRENT
+
+log = logging.getLogger("app.snapshot")
+
+SNAPSHOT_FORMATS = ("arrow", "parquet")
+
+SNAPSHOT_MEDIA_TYPES = {
+    "arrow": "application/vnd.apache.arrow.file",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+SNAPSHOT_BATCH_ROWS = 50_000
+
+
+@lru_cache(maxsize=1)
+def snapshot_schema():
+    # pyarrow is heavy to import; only snapshot builds pay for it
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("country_raw", pa.string()),
+            ("country_norm", pa.string()),
+            ("admin1_raw", pa.string()),
+            ("admin1_norm", pa.string()),
+            ("population", pa.int64()),
+            ("events", pa.int32()),
+            ("score", pa.decimal128(12, 4)),
+            # NULL unless the country's cached risk score is ready
+            ("risk_score", pa.decimal128(12, 4)),
+        ]
+    )
+
+_build_lock = threading.Lock()
+
+
+def snapshot_key(db: Session) -> str:
+    """
+    Identifies the snapshot contents: the dataset version covers conflict_data,
+    the latest computed_at covers risk scores finishing without a data change.
+    """
+    version = get_dataset_version(db)
+    latest = db.execute(
+        select(func.max(RiskScoreCache.computed_at)).where(
+            RiskScoreCache.status == STATUS_READY, RiskScoreCache.window_weeks == WINDOW_CURRENT
+        )
+    ).scalar_one_or_none()
+    risk_part = int(latest.timestamp() * 1_000_000) if latest is not None else 0
+    return f"v{version}-r{risk_part}"
+
+
+def _snapshot_query():
+    return (
+        select(
+            Country.name_raw.label("country_raw"),
+            Country.name_norm.label("country_norm"),
+            Admin1Region.name_raw.label("admin1_raw"),
+            Admin1Region.name_norm.label("admin1_norm"),
+            ConflictData.population,
+            ConflictData.events,
+            ConflictData.score,
+            case(
+                (RiskScoreCache.status == STATUS_READY, RiskScoreCache.score),
+                else_=None,
+            ).label("risk_score"),
+        )
+        .select_from(ConflictData)
+        .join(Country, Country.id == ConflictData.country_id)
+        .join(Admin1Region, Admin1Region.id == ConflictData.admin1_id)
+        .outerjoin(
+            RiskScoreCache,
+            and_(
+                RiskScoreCache.country_id == ConflictData.country_id,
+                RiskScoreCache.window_weeks == WINDOW_CURRENT,
+            ),
+        )
+        .order_by(Country.name_norm.asc(), Admin1Region.name_norm.asc())
+        .execution_options(yield_per=SNAPSHOT_BATCH_ROWS)
+    )
+
+
+def _record_batches(db: Session):
+    import pyarrow as pa
+
+    schema = snapshot_schema()
+    result = db.execute(_snapshot_query())
+    try:
+        for rows in result.partitions():
+            columns = list(zip(*rows))
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(col, type=field.type) for col, field in zip(columns, schema)],
+                schema=schema,
+            )
+    finally:
+        result.close()
+
+
+def write_snapshot(db: Session, fmt: str, path: Path) -> int:
+    """
+    Streams conflict_data (+ risk scores) into path batch by batch. Returns row count.
+    Arrow IPC is written uncompressed so clients can memory-map it zero-copy.
+    """
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+
+    schema = snapshot_schema()
+    rows = 0
+    if fmt == "arrow":
+        with pa.OSFile(str(path), "wb") as sink, ipc.new_file(sink, schema) as writer:
+            for batch in _record_batches(db):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    else:
+        with pq.ParquetWriter(str(path), schema, compression="zstd") as writer:
+            for batch in _record_batches(db):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    return rows
+
+
+def _snapshot_path(key: str, fmt: str) -> Path:
+    return Path(settings.SNAPSHOT_DIR) / f"conflict_data-{key}.{fmt}"
+
+
+_KEY_RE = re.compile(r"^conflict_data-v(\d+)-r(\d+)\.")
+
+
+def _key_order(name: str) -> Optional[tuple[int, int]]:
+    m = _KEY_RE.match(name)
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def _prune_old_snapshots(built: Path, fmt: str) -> None:
+    """
+    Removes snapshots older than the one just built, except the newest
+    SNAPSHOT_KEEP_PREVIOUS of them and any younger than SNAPSHOT_PRUNE_GRACE_SECONDS:
+    another request (or worker) may hold one of those paths and not have opened
+    it yet. Newer keys are never touched (a worker reading a lagging replica
+    builds an older key than its peers).
+    """
+    built_order = _key_order(built.name)
+    if built_order is None:
+        return
+    older: dict[tuple[int, int], list[Path]] = {}
+    for p in built.parent.glob(f"conflict_data-*.{fmt}*"):
+        order = _key_order(p.name)
+        if order is not None and order < built_order:
+            older.setdefault(order, []).append(p)
+
+    now = time.time()
+    for order in sorted(older, reverse=True)[settings.SNAPSHOT_KEEP_PREVIOUS :]:
+        for p in older[order]:
+            try:
+                if now - p.stat().st_mtime >= settings.SNAPSHOT_PRUNE_GRACE_SECONDS:
+                    p.unlink(missing_ok=True)
+            except FileNotFoundError:
+                continue
+
+
+def get_or_build_snapshot(fmt: str) -> tuple[Path, str]:
+    """
+    Returns (path, key) of the snapshot for the current dataset version, building it on a miss.
+    Key and rows are read in one REPEATABLE READ transaction so the file matches its key.
+    """
+    db: Session = ReadSessionLocal()
+    try:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        key = snapshot_key(db)
+        path = _snapshot_path(key, fmt)
+        if path.exists():
+            return path, key
+
+        with _build_lock:
+            if path.exists():
+                return path, key
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".building-", suffix=f".{fmt}")
+            os.close(fd)
+            try:
+                rows = write_snapshot(db, fmt, Path(tmp))
+                # Atomic publish: concurrent readers (or other workers) never see a partial file
+                os.replace(tmp, path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+
+            if fmt == "arrow":
+                # Precompressed once here rather than per download
+                gzip_file(path)
+
+            _prune_old_snapshots(path, fmt)
+            log.info("snapshot_built", extra={"format": fmt, "key": key, "rows": rows})
+            return path, key
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write conflict_data (+ risk scores) as Arrow IPC or Parquet")
+    parser.add_argument("--format", choices=SNAPSHOT_FORMATS, default="parquet")
+    parser.add_argument("--out", type=Path, help="write here instead of the shared snapshot cache")
+    args = parser.parse_args()
+
+    if args.out is None:
+        path, key = get_or_build_snapshot(args.format)
+        print(path)
+        return
+
+    db: Session = SessionLocal()
+    try:
+        rows = write_snapshot(db, args.format, args.out)
+    finally:
+        db.close()
+    print(f"{args.out} ({rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from app.advisory_locks import LOCK_MAINTENANCE, LOCK_STARTUP, advisory_lock
+from app.auth.admin_seed import seed_admin_if_configured
+from app.core.config import settings
+from app.db import SessionLocal
+from app.importer import import_sample_csv_if_empty
+from app.risk_cache import reset_orphaned_computing_to_failed, verify_current_aggregates
+
+log = logging.getLogger("app.startup")
+
+PHASE_PENDING = "pending"
+PHASE_WAITING_FOR_LEADER = "waiting_for_leader"
+PHASE_SEEDING_ADMIN = "seeding_admin"
+PHASE_IMPORTING_CSV = "importing_csv"
+PHASE_RESETTING_JOBS = "resetting_jobs"
+PHASE_READY = "ready"
+PHASE_FAILED = "failed"
+
+
+@dataclass
+class StartupState:
+    phase: str = PHASE_PENDING
+    rows_parsed: int = 0
+    leader: bool = False
+    error: Optional[str] = None
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.phase == PHASE_READY
+
+    def elapsed_seconds(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return round(end - self.started_at, 3)
+
+
+startup_state = StartupState()
+
+
+def _set_phase(phase: str) -> None:
+    startup_state.phase = phase
+    log.info("startup_phase", extra={"phase": phase, "elapsed_s": startup_state.elapsed_seconds()})
+
+
+def _on_import_progress(rows: int) -> None:
+    startup_state.rows_parsed = rows
+
+
+def _run_startup_duties(csv_path: Path) -> None:
+    db = SessionLocal()
+    try:
+        # First, so it only hits jobs of a previous process: the (possibly long)
+        # import below runs while requests are already enqueuing new ones
+        _set_phase(PHASE_RESETTING_JOBS)
+        reset_orphaned_computing_to_failed(db)
+
+        _set_phase(PHASE_SEEDING_ADMIN)
+        seed_admin_if_configured(db)
+
+        _set_phase(PHASE_IMPORTING_CSV)
+        import_sample_csv_if_empty(db, csv_path, on_progress=_on_import_progress)
+    finally:
+        db.close()
+
+
+def run_startup_tasks(csv_path: Path) -> None:
+    """
+    Admin seed, first-run CSV import and job reset. Runs off the event loop so the
+    app serves /health and /ready immediately. Must not raise.
+
+    With several workers/replicas, the one that gets LOCK_STARTUP first is the
+    leader and does the work. Others block on the lock until it finishes and
+    then run the same idempotent steps, which find nothing left to do (admin
+    exists, table not empty, no orphaned jobs). The same path also finishes
+    the work if the leader died half way.
+    """
+    try:
+        with advisory_lock(LOCK_STARTUP, wait=False) as leader:
+            startup_state.leader = leader
+            if leader:
+                _run_startup_duties(csv_path)
+
+        if not startup_state.leader:
+            _set_phase(PHASE_WAITING_FOR_LEADER)
+            with advisory_lock(LOCK_STARTUP, wait=True):
+                _run_startup_duties(csv_path)
+
+        startup_state.finished_at = time.monotonic()
+        _set_phase(PHASE_READY)
+    except Exception as e:
+        log.exception("startup failed")
+        startup_state.error = str(e)[:500]
+        startup_state.finished_at = time.monotonic()
+        _set_phase(PHASE_FAILED)
+
+
+def run_maintenance_loop() -> None:
+    """
+    Periodic cluster-wide duties; per tick only the worker that wins
+    LOCK_MAINTENANCE runs them. Recovers jobs orphaned by a worker that died
+    while others kept running, and every RISK_CONSISTENCY_CHECK_SECONDS (timed
+    per worker) checks the running risk aggregates against a full recompute.
+    """
+    last_check = time.monotonic()
+    while True:
+        time.sleep(settings.MAINTENANCE_INTERVAL_SECONDS)
+        if not startup_state.ready:
+            continue
+        try:
+            with advisory_lock(LOCK_MAINTENANCE, wait=False) as leader:
+                if not leader:
+                    continue
+                check_due = (
+                    settings.RISK_CONSISTENCY_CHECK_SECONDS > 0
+                    and time.monotonic() - last_check >= settings.RISK_CONSISTENCY_CHECK_SECONDS
+                )
+                drifted = None
+                db = SessionLocal()
+                try:
+                    reset = reset_orphaned_computing_to_failed(db)
+                    if check_due:
+                        last_check = time.monotonic()
+                        drifted = verify_current_aggregates(db)
+                finally:
+                    db.close()
+                if reset:
+                    log.info("orphaned risk jobs reset", extra={"rows": reset})
+                if drifted is not None:
+                    log.info("risk aggregates checked", extra={"drifted": drifted})
+        except Exception:
+            log.exception("maintenance tick failed")
+
+
+def start_background_startup(csv_path: Path) -> None:
+    threading.Thread(target=run_startup_tasks, args=(csv_path,), name="startup", daemon=True).start()
+    threading.Thread(target=run_maintenance_loop, name="maintenance", daemon=True).start()
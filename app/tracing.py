@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import logging
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from app.core.config import settings
+from app.metrics import current_db_stats
+
+log = logging.getLogger("app.request")
+
+REQUEST_ID_HEADER = "x-request-id"
+# Client-supplied ids are echoed into logs, so only accept short, plain tokens
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+@dataclass
+class RequestTrace:
+    request_id: str
+    started: float = field(default_factory=time.perf_counter)
+    # Accumulated seconds per named phase (auth, serialize, ...)
+    phases: dict[str, float] = field(default_factory=dict)
+
+
+# Set by RequestContextMiddleware; background jobs re-bind the id via bind_request_id()
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+@contextmanager
+def bind_request_id(request_id: Optional[str]) -> Iterator[None]:
+    """Tags log records inside the block with request_id (e.g. a job spawned by that request)."""
+    token = _request_id.set(request_id)
+    try:
+        yield
+    finally:
+        _request_id.reset(token)
+
+
+@contextmanager
+def trace_phase(name: str) -> Iterator[None]:
+    """Adds the block's wall time to the current request's `name` phase; no-op outside requests."""
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.phases[name] = trace.phases.get(name, 0.0) + time.perf_counter() - start
+
+
+class RequestContextMiddleware:
+    """
+    Outermost middleware. Assigns a request id (the caller's X-Request-ID if sane,
+    else a new one), echoes it in the response and exposes it to log records.
+    When the last body byte goes out after more than SLOW_REQUEST_MS, logs the
+    request with its timing breakdown. DB figures come from MetricsMiddleware's
+    per-request stats, so it must run inside this one.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for k, v in scope.get("headers", ()):
+            if k == REQUEST_ID_HEADER.encode():
+                value = v.decode("latin-1")
+                if _VALID_REQUEST_ID.match(value):
+                    request_id = value
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+
+        trace = RequestTrace(request_id=request_id)
+        id_token = _request_id.set(request_id)
+        trace_token = _trace.set(trace)
+        status_code = 500
+        finished = False
+
+        def finish() -> None:
+            nonlocal finished
+            finished = True
+            total = time.perf_counter() - trace.started
+            if total * 1000 >= settings.SLOW_REQUEST_MS:
+                self._log_slow(scope, status_code, total, trace)
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [*message.get("headers", ()), (REQUEST_ID_HEADER.encode(), request_id.encode())]}
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) and not finished:
+                finish()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not finished:
+                finish()
+            _trace.reset(trace_token)
+            _request_id.reset(id_token)
+
+    @staticmethod
+    def _log_slow(scope, status_code: int, total: float, trace: RequestTrace) -> None:
+        route = scope.get("route")
+        breakdown = {f"{name}_ms": round(seconds * 1000, 1) for name, seconds in trace.phases.items()}
+        stats = current_db_stats()
+        if stats is not None:
+            breakdown.update(
+                db_ms=round(stats.db_seconds * 1000, 1),
+                db_queries=stats.query_count,
+                db_slowest_ms=round(stats.slowest_seconds * 1000, 1),
+                # Statement text only; parameters may carry user data
+                db_slowest_statement=(stats.slowest_statement or "")[:500] or None,
+            )
+        log.warning(
+            "slow_request",
+            extra={
+                "method": scope["method"],
+                "route": getattr(route, "path", scope["path"]),
+                "status": status_code,
+                "total_ms": round(total * 1000, 1),
+                **breakdown,
+            },
+        )
@@ -0,0 +1,150 @@
+"""
+Deterministic synthetic dataset in the sample_data.csv schema
+(country, admin1, population, events, score).
+
+    python -m bench.generate_dataset --rows 1000000 --out data_1m.csv
+    python -m bench.generate_dataset --rows 50000000 --seed 7 --out data_50m.csv
+
+Countries and their real admin1 names come from sample_data.csv. Rows are
+spread over countries with a Zipf-like skew, so a few countries hold most of
+the rows as in real ACLED exports. Admin1 names beyond the real ones get a
+numeric suffix to keep (country, admin1) unique. Some rows get
+whitespace/case noise so norm() has real work to do. The same --rows/--seed
+always produces byte-identical output, and memory does not depend on --rows.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import math
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Iterator, TextIO
+
+SAMPLE_CSV = Path(__file__).resolve().parent.parent / "sample_data.csv"
+CSV_HEADER = ("country", "admin1", "population", "events", "score")
+
+# conflict_data name columns are varchar(50)
+MAX_NAME_LEN = 50
+
+
+def load_sample(path: Path) -> tuple[dict[str, list[str]], list[int], Counter]:
+    admin1_by_country: dict[str, list[str]] = {}
+    populations: list[int] = []
+    scores: Counter = Counter()
+    with path.open(newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            admin1_by_country.setdefault(r["country"].strip(), []).append(r["admin1"].strip())
+            if r["population"].strip():
+                populations.append(int(r["population"]))
+            scores[r["score"].strip()] += 1
+    return admin1_by_country, populations, scores
+
+
+def country_row_counts(countries: list[str], rows: int, skew: float, rng: random.Random) -> dict[str, int]:
+    """Splits `rows` across countries with weight ~ 1/rank**skew (rank order is seeded)."""
+    ranked = countries[:]
+    rng.shuffle(ranked)
+    weights = [1 / (rank ** skew) for rank in range(1, len(ranked) + 1)]
+    total = sum(weights)
+    counts = {c: int(rows * w / total) for c, w in zip(ranked, weights)}
+    # Hand out the rounding remainder to the largest countries first
+    remainder = rows - sum(counts.values())
+    for c in ranked[:remainder]:
+        counts[c] += 1
+    return counts
+
+
+def _dirty(value: str, rng: random.Random) -> str:
+    choice = rng.randrange(3)
+    if choice == 0:
+        out = f"  {value} "
+    elif choice == 1:
+        out = value.upper()
+    else:
+        out = value.replace(" ", "  ")
+    return out if len(out) <= MAX_NAME_LEN else value
+
+
+def generate_rows(
+    rows: int,
+    *,
+    seed: int = 1,
+    skew: float = 1.1,
+    dirty_fraction: float = 0.02,
+    sample_path: Path = SAMPLE_CSV,
+) -> Iterator[tuple[str, str, str, int, str]]:
+    rng = random.Random(seed)
+    admin1_by_country, populations, scores = load_sample(sample_path)
+    countries = sorted(admin1_by_country)
+    counts = country_row_counts(countries, rows, skew, rng)
+
+    pop_logs = [math.log(p) for p in populations if p > 0]
+    pop_mu = sum(pop_logs) / len(pop_logs)
+    pop_sigma = math.sqrt(sum((x - pop_mu) ** 2 for x in pop_logs) / len(pop_logs))
+    score_values = list(scores)
+    score_weights = [scores[v] for v in score_values]
+
+    for country in countries:
+        base_names = admin1_by_country[country]
+        for i in range(counts[country]):
+            base = base_names[i % len(base_names)]
+            cycle = i // len(base_names)
+            if cycle == 0:
+                admin1 = base
+            else:
+                suffix = f" {cycle}"
+                admin1 = base[: MAX_NAME_LEN - len(suffix)] + suffix
+
+            country_out = country
+            if rng.random() < dirty_fraction:
+                country_out = _dirty(country, rng)
+                admin1 = _dirty(admin1, rng)
+
+            # ~1 in 50 rows has no population, like the real feed
+            population = "" if rng.random() < 0.02 else str(int(rng.lognormvariate(pop_mu, pop_sigma)))
+            # Heavy-tailed event counts: most regions quiet, a few very active
+            events = int(rng.paretovariate(1.3) * 20) - 20
+            score = rng.choices(score_values, score_weights)[0]
+            yield country_out, admin1, population, max(events, 0), score
+
+
+def write_csv(out: TextIO, rows: Iterator[tuple]) -> int:
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(CSV_HEADER)
+    n = 0
+    for row in rows:
+        writer.writerow(row)
+        n += 1
+    return n
+
+
+def parse_size(value: str) -> int:
+    """Accepts 1000000, 1M, 250k, 50M."""
+    v = value.strip().lower().replace("_", "")
+    mult = {"k": 1_000, "m": 1_000_000}.get(v[-1:], 1)
+    return int(float(v[:-1] if mult != 1 else v) * mult)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=parse_size, required=True, help="e.g. 1M, 50M")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for rows per country")
+    parser.add_argument("--dirty-fraction", type=float, default=0.02)
+    parser.add_argument("--out", type=Path, help="CSV path (default: stdout)")
+    args = parser.parse_args()
+
+    rows = generate_rows(args.rows, seed=args.seed, skew=args.skew, dirty_fraction=args.dirty_fraction)
+    if args.out is None:
+        n = write_csv(sys.stdout, rows)
+    else:
+        with args.out.open("w", newline="", encoding="utf-8") as f:
+            n = write_csv(f, rows)
+    print(f"wrote {n} rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
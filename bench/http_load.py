@@ -0,0 +1,285 @@
+"""
+HTTP load driver for the API.
+
+    python -m bench.http_load --scenario mixed --duration 60 --concurrency 32 --out results.json
+    python -m bench.http_load --scenario read-only --compare baseline.json
+
+Mints JWTs through /register + /login, then runs weighted operations from
+bench.scenarios with a fixed number of concurrent workers and reports
+p50/p95/p99 latency and requests/sec per operation.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+import httpx
+
+from bench.scenarios import BENCH_PASSWORD, OPERATIONS, SCENARIOS, BenchContext, Scenario
+
+DISCOVERY_PER_PAGE = 100
+
+
+@dataclass
+class OpStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: dict[int, int] = field(default_factory=dict)
+
+    def record(self, status: Optional[int], seconds: float, ok: bool) -> None:
+        self.latencies.append(seconds)
+        if status is not None:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not ok:
+            self.errors += 1
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(stats: OpStats, elapsed: float) -> dict:
+    lat = sorted(stats.latencies)
+    n = len(lat)
+    return {
+        "requests": n,
+        "errors": stats.errors,
+        "rps": round(n / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(lat) / n * 1000, 3) if n else 0.0,
+        "p50_ms": round(percentile(lat, 50) * 1000, 3),
+        "p95_ms": round(percentile(lat, 95) * 1000, 3),
+        "p99_ms": round(percentile(lat, 99) * 1000, 3),
+        "max_ms": round(lat[-1] * 1000, 3) if n else 0.0,
+        "statuses": {str(k): v for k, v in sorted(stats.statuses.items())},
+    }
+
+
+async def mint_tokens(client: httpx.AsyncClient, prefix: str, users: int) -> tuple[list[str], list[str]]:
+    emails = [f"{prefix}-{i}@example.com" for i in range(users)]
+    tokens = []
+    for email in emails:
+        # 409 when re-using a prefix from an earlier run is fine
+        await client.post("/register", json={"email": email, "password": BENCH_PASSWORD})
+        r = await client.post("/login", json={"email": email, "password": BENCH_PASSWORD})
+        r.raise_for_status()
+        tokens.append(r.json()["access_token"])
+    return emails, tokens
+
+
+async def login_admin(client: httpx.AsyncClient, email: Optional[str], password: Optional[str]) -> Optional[str]:
+    if not email or not password:
+        return None
+    r = await client.post("/login", json={"email": email, "password": password})
+    r.raise_for_status()
+    return r.json()["access_token"]
+
+
+async def discover(client: httpx.AsyncClient, token: str, max_pages: int):
+    """Pages through /conflictdata to learn country names and (country, admin1) pairs."""
+    headers = {"Authorization": f"Bearer {token}"}
+    countries: list[str] = []
+    rows: list[tuple[str, str]] = []
+    for page in range(1, max_pages + 1):
+        r = await client.get(
+            "/conflictdata", params={"page": page, "per_page": DISCOVERY_PER_PAGE}, headers=headers
+        )
+        r.raise_for_status()
+        groups = r.json()["countries"]
+        if not groups:
+            break
+        for g in groups:
+            countries.append(g["country_raw"])
+            rows.extend((g["country_raw"], row["admin1_raw"]) for row in g["rows"])
+        if len(groups) < DISCOVERY_PER_PAGE:
+            break
+    if not countries:
+        raise SystemExit("no conflict data found; is the database imported?")
+    return countries, rows
+
+
+async def worker(
+    client: httpx.AsyncClient,
+    ctx: BenchContext,
+    scenario: Scenario,
+    deadline: float,
+    measure_from: float,
+    results: dict[str, OpStats],
+) -> None:
+    names = list(scenario.weights)
+    weights = [scenario.weights[n] for n in names]
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            return
+        op = OPERATIONS[ctx.rng.choices(names, weights)[0]]
+        if op.admin and ctx.admin_token is None:
+            await asyncio.sleep(0)
+            continue
+
+        start = time.perf_counter()
+        status: Optional[int] = None
+        try:
+            resp = await op.fn(client, ctx)
+            if resp is None:
+                # Nothing left to do for this op (e.g. deletable rows exhausted)
+                await asyncio.sleep(0)
+                continue
+            await resp.aread()
+            status = resp.status_code
+            ok = 200 <= status < 300 or status in op.expected
+        except httpx.HTTPError:
+            ok = False
+        elapsed = time.perf_counter() - start
+
+        if start >= measure_from:
+            results.setdefault(op.name, OpStats()).record(status, elapsed, ok)
+
+
+async def refresh_tokens(client: httpx.AsyncClient, ctx: BenchContext, every: float, deadline: float) -> None:
+    """Re-mints user JWTs periodically so runs longer than JWT_EXPIRE_MINUTES don't turn into 401s."""
+    while time.perf_counter() + every < deadline:
+        await asyncio.sleep(every)
+        for i, email in enumerate(ctx.user_emails):
+            r = await client.post("/login", json={"email": email, "password": BENCH_PASSWORD})
+            if r.status_code == 200:
+                ctx.user_tokens[i] = r.json()["access_token"]
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    scenario = SCENARIOS[args.scenario]
+    rng = random.Random(args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        prefix = f"bench-{args.seed}"
+        emails, tokens = await mint_tokens(client, prefix, args.users)
+        admin_token = await login_admin(client, args.admin_email, args.admin_password)
+        countries, rows = await discover(client, tokens[0], args.discover_pages)
+
+        rows = rows[:]
+        rng.shuffle(rows)
+        # Rows reserved for deletes are never used for feedback, so feedback doesn't 404 mid-run
+        reserved = max(1, len(rows) // 10) if scenario.weights.get("admin_delete") else 0
+        ctx = BenchContext(
+            rng=rng,
+            user_emails=emails,
+            user_tokens=tokens,
+            admin_token=admin_token,
+            countries=countries,
+            admin1_rows=rows[reserved:] or rows,
+            country_pages=math.ceil(len(countries) / 20),
+            deletable_rows=rows[:reserved],
+        )
+
+        results: dict[str, OpStats] = {}
+        start = time.perf_counter()
+        measure_from = start + args.warmup
+        deadline = measure_from + args.duration
+        await asyncio.gather(
+            refresh_tokens(client, ctx, args.token_refresh, deadline),
+            *(worker(client, ctx, scenario, deadline, measure_from, results) for _ in range(args.concurrency)),
+        )
+        elapsed = time.perf_counter() - measure_from
+
+    overall = OpStats()
+    for s in results.values():
+        overall.latencies.extend(s.latencies)
+        overall.errors += s.errors
+        for k, v in s.statuses.items():
+            overall.statuses[k] = overall.statuses.get(k, 0) + v
+
+    return {
+        "meta": {
+            "scenario": scenario.name,
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "seed": args.seed,
+            "users": args.users,
+            "git_rev": git_revision(),
+            "python": platform.python_version(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "overall": summarize(overall, elapsed),
+        "operations": {name: summarize(s, elapsed) for name, s in sorted(results.items())},
+    }
+
+
+def print_report(report: dict, baseline: Optional[dict]) -> None:
+    cols = ("requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms")
+    print(f"scenario={report['meta']['scenario']} concurrency={report['meta']['concurrency']} duration={report['meta']['duration_s']}s")
+    print(f"{'operation':<24}" + "".join(f"{c:>12}" for c in cols))
+    rows = list(report["operations"].items()) + [("TOTAL", report["overall"])]
+    for name, s in rows:
+        print(f"{name:<24}" + "".join(f"{s[c]:>12}" for c in cols))
+        if baseline is None:
+            continue
+        base = baseline["overall"] if name == "TOTAL" else baseline["operations"].get(name)
+        if base is None:
+            continue
+        deltas = []
+        for c in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            if base[c]:
+                deltas.append(f"{c} {100 * (s[c] - base[c]) / base[c]:+.1f}%")
+        print(f"{'':<24}  vs baseline: " + ", ".join(deltas))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="read-only")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds before measuring starts")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=8, help="JWTs to mint and rotate through")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--token-refresh", type=float, default=240, help="seconds between JWT re-logins")
+    parser.add_argument("--discover-pages", type=int, default=3, help="pages of 100 countries to discover")
+    parser.add_argument("--admin-email", default=os.getenv("ADMIN_EMAIL"))
+    parser.add_argument("--admin-password", default=os.getenv("ADMIN_PASSWORD"))
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to diff against")
+    parser.add_argument("--yes", action="store_true", help="allow scenarios that delete data")
+    args = parser.parse_args()
+
+    if SCENARIOS[args.scenario].destructive and not args.yes:
+        sys.exit(f"scenario '{args.scenario}' deletes conflict data; re-run with --yes against a scratch database")
+
+    report = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
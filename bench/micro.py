@@ -0,0 +1,180 @@
+"""
+Importer / query microbenchmarks at growing data sizes.
+
+    python -m bench.micro norm
+    python -m bench.micro db --sizes 100k,1M,5M --yes --out micro.json
+
+`norm` needs no database. `db` TRUNCATEs conflict_data (and what references
+it) in the database at DATABASE_URL, so point it at a scratch database. For
+each size it generates a dataset with bench.generate_dataset, then measures:
+
+* import rows/sec through import_sample_csv_if_empty
+* fetch_conflictdata_grouped_by_country latency at shallow and deep pages
+* compute_country_risk_score wall time for the largest and smallest country
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from bench.generate_dataset import generate_rows, parse_size, write_csv
+
+
+def _timeit(fn: Callable[[], object], repeat: int) -> list[float]:
+    out = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        out.append(time.perf_counter() - start)
+    return out
+
+
+def _ms(samples: list[float]) -> dict:
+    s = sorted(samples)
+    return {
+        "min_ms": round(s[0] * 1000, 3),
+        "median_ms": round(statistics.median(s) * 1000, 3),
+        "max_ms": round(s[-1] * 1000, 3),
+    }
+
+
+def bench_norm(strings: int = 200_000, repeat: int = 5) -> dict:
+    from app.core.normalize import norm
+
+    values = [
+        "  Democratic  Republic of Congo ",
+        "Algeria",
+        "SAINT VINCENT AND THE GRENADINES",
+        "Ain  Defla",
+        "  Badakhshan",
+    ] * (strings // 5)
+
+    def run() -> None:
+        for v in values:
+            norm(v)
+
+    best = min(_timeit(run, repeat))
+    return {"strings": len(values), "calls_per_sec": round(len(values) / best)}
+
+
+def _reset_conflict_data(db) -> None:
+    from sqlalchemy import text
+
+    # CASCADE covers user_feedback; risk cache rows would otherwise report old scores
+    db.execute(text("TRUNCATE conflict_data, conflict_history, risk_score_cache RESTART IDENTITY CASCADE"))
+    db.commit()
+
+
+def bench_db_size(rows: int, seed: int, page_repeat: int) -> dict:
+    from sqlalchemy import func, select
+
+    from app.conflict_queries import fetch_conflictdata_grouped_by_country
+    from app.db import SessionLocal
+    from app.importer import import_sample_csv_if_empty
+    from app.models import ConflictData, Country
+    from app.risk_cache import get_or_create_cache_row
+    from app.risk_compute import compute_country_risk_score
+
+    result: dict = {"rows": rows}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "data.csv"
+        start = time.perf_counter()
+        with csv_path.open("w", newline="", encoding="utf-8") as f:
+            write_csv(f, generate_rows(rows, seed=seed))
+        result["generate_s"] = round(time.perf_counter() - start, 3)
+
+        db = SessionLocal()
+        try:
+            _reset_conflict_data(db)
+            start = time.perf_counter()
+            import_sample_csv_if_empty(db, csv_path)
+            elapsed = time.perf_counter() - start
+            result["import"] = {"seconds": round(elapsed, 3), "rows_per_sec": round(rows / elapsed)}
+        finally:
+            db.close()
+
+    db = SessionLocal()
+    try:
+        per_country = db.execute(
+            select(Country.name_norm, func.count())
+            .join(ConflictData, ConflictData.country_id == Country.id)
+            .group_by(Country.name_norm)
+            .order_by(func.count().desc())
+        ).all()
+        countries = len(per_country)
+
+        per_page = 20
+        last_page = max(1, -(-countries // per_page))
+        pages = sorted({1, max(1, last_page // 2), last_page})
+        result["page_query"] = {
+            str(page): _ms(
+                _timeit(
+                    lambda page=page: fetch_conflictdata_grouped_by_country(db, page=page, per_page=per_page),
+                    page_repeat,
+                )
+            )
+            for page in pages
+        }
+
+        risk = {}
+        for label, (country_norm, n) in (("largest", per_country[0]), ("smallest", per_country[-1])):
+            get_or_create_cache_row(db, country_norm)
+            db.commit()
+            start = time.perf_counter()
+            compute_country_risk_score(country_norm)
+            risk[label] = {"country_norm": country_norm, "rows": n, "ms": round((time.perf_counter() - start) * 1000, 3)}
+        result["risk_recompute"] = risk
+        result["countries"] = countries
+    finally:
+        db.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("suite", choices=("norm", "db"))
+    parser.add_argument("--sizes", default="100k,1M", help="comma separated row counts for the db suite")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--page-repeat", type=int, default=20)
+    parser.add_argument("--yes", action="store_true", help="allow TRUNCATE of conflict_data")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    report: dict = {
+        "meta": {
+            "suite": args.suite,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        }
+    }
+
+    if args.suite == "norm":
+        report["norm"] = bench_norm()
+    else:
+        if not args.yes:
+            sys.exit("the db suite truncates conflict_data; re-run with --yes against a scratch database")
+        if not os.getenv("DATABASE_URL"):
+            sys.exit("DATABASE_URL is required for the db suite")
+        report["sizes"] = []
+        for size in (parse_size(s) for s in args.sizes.split(",")):
+            print(f"running size={size}", file=sys.stderr)
+            report["sizes"].append(bench_db_size(size, args.seed, args.page_repeat))
+
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+EXPLAIN regression check: the hot read queries must stay index-only.
+
+    python -m bench.plans
+    python -m bench.plans --country algeria --weeks 12 --show
+
+Builds the same statements the endpoints run (app.conflict_queries,
+app.history, app.risk_compute), EXPLAINs them against DATABASE_URL and exits
+non-zero if any scan of a covered table is not an Index Only Scan. Run it
+after schema or query changes; it needs a migrated database with data.
+
+Before explaining it runs VACUUM (ANALYZE) on the covered tables, because
+index-only scans depend on the visibility map. That updates the visibility
+map and planner statistics of the target database (as autovacuum would);
+rows are never changed. Seq and bitmap scans are disabled for the EXPLAIN
+transaction: sample-sized tables are small enough that the planner would
+rather read the heap, but the point here is whether the covering indexes
+*can* serve the query.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Callable, Iterator
+
+from sqlalchemy import text
+
+# Tables whose scans must be index-only; partitions match by prefix
+COVERED_TABLES = ("conflict_data", "conflict_history", "admin1_regions")
+
+
+def hot_queries(country_norm: str, weeks: int, db) -> dict[str, object]:
+    from app.conflict_queries import country_page_query, country_rows_query
+    from app.history import history_rows_query, window_start
+    from app.risk_compute import current_avg_query, window_avg_query
+
+    queries: dict[str, object] = {
+        "country_rows": country_rows_query(country_norm),
+        "country_page": country_page_query(1, 20),
+        "risk_avg_current": current_avg_query(country_norm),
+    }
+    since = window_start(db, weeks)
+    if since is not None:
+        queries["history_rows"] = history_rows_query(country_norm, since)
+        queries["risk_avg_window"] = window_avg_query(country_norm, since)
+    return queries
+
+
+def _scans(plan: dict) -> Iterator[dict]:
+    if "Relation Name" in plan:
+        yield plan
+    for child in plan.get("Plans", ()):
+        yield from _scans(child)
+
+
+def _covered(relation: str) -> bool:
+    return any(relation == t or relation.startswith(t + "_") for t in COVERED_TABLES)
+
+
+def check_plan(plan: dict) -> list[str]:
+    """Returns one problem per covered-table scan that isn't index-only."""
+    return [
+        f"{node['Node Type']} on {node['Relation Name']}"
+        for node in _scans(plan)
+        if _covered(node["Relation Name"]) and node["Node Type"] != "Index Only Scan"
+    ]
+
+
+def explain(conn, stmt) -> dict:
+    compiled = stmt.compile(dialect=conn.dialect)
+    result = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params).scalar_one()
+    doc = result if isinstance(result, list) else json.loads(result)
+    return doc[0]["Plan"]
+
+
+def vacuum(engine) -> None:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in COVERED_TABLES:
+            conn.exec_driver_sql(f"VACUUM (ANALYZE) {table}")
+
+
+def run(country_norm: str, weeks: int, show: Callable[[str, dict], None] | None) -> list[str]:
+    from app.db import SessionLocal, engine
+
+    vacuum(engine)
+    failures = []
+    db = SessionLocal()
+    try:
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+        db.execute(text("SET LOCAL enable_bitmapscan = off"))
+        conn = db.connection()
+        for name, stmt in hot_queries(country_norm, weeks, db).items():
+            plan = explain(conn, stmt)
+            if show is not None:
+                show(name, plan)
+            problems = check_plan(plan)
+            status = "ok" if not problems else "FAIL: " + "; ".join(problems)
+            print(f"{name:<20} {status}")
+            failures.extend(f"{name}: {p}" for p in problems)
+    finally:
+        db.rollback()
+        db.close()
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--country", default="algeria", help="normalized country to plan for")
+    parser.add_argument("--weeks", type=int, default=12, help="history window to plan for")
+    parser.add_argument("--show", action="store_true", help="print each JSON plan")
+    args = parser.parse_args()
+
+    show = (lambda name, plan: print(name, json.dumps(plan, indent=2))) if args.show else None
+    failures = run(args.country, args.weeks, show)
+    if failures:
+        sys.exit(f"{len(failures)} scan(s) are not index-only")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+
+@dataclass
+class BenchContext:
+    """State shared by all workers: minted tokens plus ids discovered from the API."""
+
+    rng: random.Random
+    user_emails: list[str]
+    user_tokens: list[str]
+    admin_token: Optional[str]
+    countries: list[str]
+    # (country_raw, admin1_raw) pairs used for feedback writes and admin deletes
+    admin1_rows: list[tuple[str, str]]
+    country_pages: int
+    deletable_rows: list[tuple[str, str]] = field(default_factory=list)
+
+    def user_headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.rng.choice(self.user_tokens)}"}
+
+    def admin_headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self.admin_token}"}
+
+
+BENCH_PASSWORD = "bench-password-123"
+
+OpFn = Callable[[httpx.AsyncClient, BenchContext], Awaitable[Optional[httpx.Response]]]
+
+
+@dataclass(frozen=True)
+class Operation:
+    name: str
+    route: str
+    fn: OpFn
+    # Statuses that count as success besides 2xx (e.g. 202 while a score computes)
+    expected: frozenset[int] = frozenset()
+    admin: bool = False
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    description: str
+    weights: dict[str, float]
+    destructive: bool = False
+
+
+async def _health(client: httpx.AsyncClient, ctx: BenchContext):
+    return await client.get("/health")
+
+
+async def _ready(client: httpx.AsyncClient, ctx: BenchContext):
+    return await client.get("/ready")
+
+
+async def _metrics(client: httpx.AsyncClient, ctx: BenchContext):
+    return await client.get("/metrics")
+
+
+async def _login(client: httpx.AsyncClient, ctx: BenchContext):
+    email = ctx.rng.choice(ctx.user_emails)
+    return await client.post("/login", json={"email": email, "password": BENCH_PASSWORD})
+
+
+async def _register(client: httpx.AsyncClient, ctx: BenchContext):
+    email = f"bench-extra-{ctx.rng.getrandbits(48):012x}@example.com"
+    return await client.post("/register", json={"email": email, "password": BENCH_PASSWORD})
+
+
+async def _conflictdata_page(client: httpx.AsyncClient, ctx: BenchContext):
+    page = ctx.rng.randint(1, max(ctx.country_pages, 1))
+    return await client.get(
+        "/conflictdata", params={"page": page, "per_page": 20}, headers=ctx.user_headers()
+    )
+
+
+def _country_selection(ctx: BenchContext) -> list[str]:
+    return ctx.rng.sample(ctx.countries, min(len(ctx.countries), 5))
+
+
+async def _conflictdata_countries(client: httpx.AsyncClient, ctx: BenchContext):
+    return await client.get(
+        "/conflictdata",
+        params={"countries": ",".join(_country_selection(ctx))},
+        headers=ctx.user_headers(),
+    )
+
+
+async def _conflictdata_query(client: httpx.AsyncClient, ctx: BenchContext):
+    return await client.post(
+        "/conflictdata/query", json={"countries": _country_selection(ctx)}, headers=ctx.user_headers()
+    )
+
+
+async def _conflictdata_country(client: httpx.AsyncClient, ctx: BenchContext):
+    country = ctx.rng.choice(ctx.countries)
+    return await client.get(f"/conflictdata/{country}", headers=ctx.user_headers())
+
+
+async def _riskscore(client: httpx.AsyncClient, ctx: BenchContext):
+    country = ctx.rng.choice(ctx.countries)
+    return await client.get(f"/conflictdata/{country}/riskscore", headers=ctx.user_headers())
+
+
+async def _history(client: httpx.AsyncClient, ctx: BenchContext):
+    country = ctx.rng.choice(ctx.countries)
+    return await client.get(
+        f"/conflictdata/{country}/history", params={"weeks": 12}, headers=ctx.user_headers()
+    )
+
+
+async def _feedback(client: httpx.AsyncClient, ctx: BenchContext):
+    country, admin1 = ctx.rng.choice(ctx.admin1_rows)
+    return await client.post(
+        f"/conflictdata/{admin1}/userfeedback",
+        json={"country": country, "feedback": "benchmark feedback, please ignore"},
+        headers=ctx.user_headers(),
+    )
+
+
+async def _feedback_stats(client: httpx.AsyncClient, ctx: BenchContext):
+    if ctx.rng.random() < 0.5:
+        params = {"group_by": "country"}
+    else:
+        params = {"group_by": "admin1", "country": ctx.rng.choice(ctx.countries)}
+    return await client.get("/feedback/stats", params=params, headers=ctx.user_headers())
+
+
+async def _admin_delete(client: httpx.AsyncClient, ctx: BenchContext):
+    if not ctx.deletable_rows:
+        return None
+    country, admin1 = ctx.deletable_rows.pop()
+    return await client.request(
+        "DELETE",
+        "/conflictdata",
+        json={"country": country, "admin1": admin1},
+        headers=ctx.admin_headers(),
+    )
+
+
+async def _export_country(client: httpx.AsyncClient, ctx: BenchContext):
+    country = ctx.rng.choice(ctx.countries)
+    return await client.get(
+        "/conflictdata/export",
+        params={"format": "ndjson", "country": country},
+        headers=ctx.user_headers(),
+    )
+
+
+async def _snapshot(client: httpx.AsyncClient, ctx: BenchContext):
+    return await client.get(
+        "/conflictdata/snapshot", params={"format": "arrow"}, headers=ctx.user_headers()
+    )
+
+
+OPERATIONS: dict[str, Operation] = {
+    op.name: op
+    for op in (
+        Operation("health", "GET /health", _health),
+        Operation("ready", "GET /ready", _ready),
+        Operation("metrics", "GET /metrics", _metrics),
+        Operation("login", "POST /login", _login),
+        Operation("register", "POST /register", _register),
+        Operation("conflictdata_page", "GET /conflictdata", _conflictdata_page),
+        Operation("conflictdata_countries", "GET /conflictdata?countries=", _conflictdata_countries),
+        Operation("conflictdata_query", "POST /conflictdata/query", _conflictdata_query),
+        Operation("conflictdata_country", "GET /conflictdata/{country}", _conflictdata_country),
+        Operation("riskscore", "GET /conflictdata/{country}/riskscore", _riskscore, frozenset({202})),
+        Operation("history", "GET /conflictdata/{country}/history", _history),
+        Operation("feedback", "POST /conflictdata/{admin1}/userfeedback", _feedback),
+        Operation("feedback_stats", "GET /feedback/stats", _feedback_stats),
+        # A row may already be gone if a previous run deleted it
+        Operation("admin_delete", "DELETE /conflictdata", _admin_delete, frozenset({404}), admin=True),
+        Operation("export_country", "GET /conflictdata/export", _export_country),
+        Operation("snapshot", "GET /conflictdata/snapshot", _snapshot),
+    )
+}
+
+
+SCENARIOS: dict[str, Scenario] = {
+    s.name: s
+    for s in (
+        Scenario(
+            "mixed",
+            "Dashboard-like traffic: 90% conflictdata reads, riskscore polling, feedback writes, rare admin deletes",
+            {
+                "conflictdata_page": 45,
+                "conflictdata_country": 45,
+                "riskscore": 6,
+                "feedback": 3,
+                "admin_delete": 0.5,
+                "login": 0.5,
+            },
+            destructive=True,
+        ),
+        Scenario(
+            "read-only",
+            "Reads only: conflict data is never changed (riskscore polling does fill the score cache, as in production); safe to repeat against the same database",
+            {
+                "conflictdata_page": 50,
+                "conflictdata_country": 40,
+                "riskscore": 10,
+            },
+        ),
+        Scenario(
+            "all-routes",
+            "Every route in app/main.py with equal weight",
+            {name: 1 for name in OPERATIONS},
+            destructive=True,
+        ),
+        Scenario(
+            "auth",
+            "bcrypt-bound /login and /register",
+            {"login": 80, "register": 20},
+        ),
+        Scenario(
+            "export",
+            "Bulk per-country NDJSON exports and snapshot downloads",
+            {"export_country": 80, "snapshot": 20},
+        ),
+    )
+}
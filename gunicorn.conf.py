@@ -0,0 +1,66 @@
+"""
+Multi-process serving: one gunicorn master with N uvicorn workers.
+
+    gunicorn app.main:app -c gunicorn.conf.py
+
+WEB_CONCURRENCY sets the worker count (default: CPU count). Each worker has
+its own DB pool (DB_POOL_SIZE + DB_MAX_OVERFLOW), so size Postgres
+max_connections accordingly. Startup/maintenance duties are coordinated
+through advisory locks (app/advisory_locks.py), so only one worker does them.
+Cached responses are shared between the workers through SHARED_CACHE_DIR.
+Behind a reverse proxy, set FORWARDED_ALLOW_IPS to the proxy's address.
+"""
+import multiprocessing
+import os
+import shutil
+import stat
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# Peers whose X-Forwarded-For is believed (comma-separated exact IPs, or "*").
+# Uvicorn then puts the real client address in the ASGI scope, which the
+# anonymous rate limit keys on (app/admission.py); without it every request
+# through a reverse proxy would share the proxy's bucket.
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+# Prometheus multiprocess mode: workers write metric files here and /metrics
+# aggregates them. Must be set before prometheus_client is imported in the workers.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+
+# Node-local response cache shared by the workers (app/shared_cache.py)
+os.environ.setdefault("SHARED_CACHE_DIR", "/dev/shm/acled-response-cache")
+
+
+def on_starting(server):
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    # Files from a previous master would be summed into the new one's metrics
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+    # Shared cache entries are keyed by dataset version only, which restarts
+    # at 1 on a fresh database; a new master must not serve them
+    cache_dir = os.environ["SHARED_CACHE_DIR"]
+    if cache_dir:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        # /dev/shm is world-writable: recreate the directory private to us, and
+        # turn the cache off for the workers if someone else's is in the way
+        try:
+            os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+            st = os.lstat(cache_dir)
+            private = stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+        except OSError:
+            private = False
+        if not private:
+            server.log.warning("SHARED_CACHE_DIR %s is not private to this user; shared cache disabled", cache_dir)
+            os.environ["SHARED_CACHE_DIR"] = ""
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
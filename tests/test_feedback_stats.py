@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+
+def _country_count(client, headers, country_raw: str):
+    r = client.get("/feedback/stats", params={"group_by": "country", "limit": 500}, headers=headers)
+    assert r.status_code == 200, r.text
+    return {s["country_raw"]: s["feedback_count"] for s in r.json()["rows"]}.get(country_raw)
+
+
+def test_delete_only_row_with_feedback(client, user_headers, admin_headers):
+    # Before the fix the country rollup was updated to last_feedback_at NULL
+    # (NOT NULL violation) and the delete answered 500
+    r = client.post(
+        "/conflictdata/tindouf/userfeedback",
+        headers=user_headers,
+        json={"country": "algeria", "feedback": "only feedback for this country"},
+    )
+    assert r.status_code == 200, r.text
+    assert _country_count(client, user_headers, "Algeria") == 1
+
+    r = client.request("DELETE", "/conflictdata", headers=admin_headers, json={"country": "algeria", "admin1": "tindouf"})
+    assert r.status_code == 200, r.text
+    assert _country_count(client, user_headers, "Algeria") is None
+
+
+def test_delete_one_of_several_rows_with_feedback(client, user_headers, admin_headers):
+    for admin1 in ("kabul", "herat"):
+        r = client.post(
+            f"/conflictdata/{admin1}/userfeedback",
+            headers=user_headers,
+            json={"country": "afghanistan", "feedback": "feedback on two regions"},
+        )
+        assert r.status_code == 200, r.text
+    before = _country_count(client, user_headers, "Afghanistan")
+
+    r = client.request("DELETE", "/conflictdata", headers=admin_headers, json={"country": "afghanistan", "admin1": "kabul"})
+    assert r.status_code == 200, r.text
+    assert _country_count(client, user_headers, "Afghanistan") == before - 1
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from datetime import date
+
+from app.importer import _read_csv
+
+
+def _history_admin1s(client, headers) -> set[str]:
+    r = client.get("/conflictdata/algeria/history", params={"weeks": 4}, headers=headers)
+    assert r.status_code == 200, r.text
+    return {row["admin1_raw"] for row in r.json()}
+
+
+def test_admin_delete_keeps_history(client, user_headers, admin_headers):
+    assert "Tlemcen" in _history_admin1s(client, user_headers)
+
+    r = client.request("DELETE", "/conflictdata", headers=admin_headers, json={"country": "algeria", "admin1": "tlemcen"})
+    assert r.status_code == 200, r.text
+
+    # Gone from the current data, still in the weeks it was reported for
+    current = client.get("/conflictdata/algeria", headers=user_headers).json()
+    assert "Tlemcen" not in {row["admin1_raw"] for row in current}
+    assert "Tlemcen" in _history_admin1s(client, user_headers)
+
+
+def test_read_csv_ragged_period_column(tmp_path):
+    path = tmp_path / "feed.csv"
+    path.write_text(
+        "country,admin1,population,events,score,period\n"
+        "Algeria,Adrar,100,3,9.5,2026-01-07\n"
+        "Algeria,Tlemcen,100,3,9.5\n"
+    )
+    rows = _read_csv(path, date(2026, 3, 2), None)
+    assert {r["admin1_raw"]: r["period_start"] for r in rows} == {
+        "Adrar": date(2026, 1, 5),
+        "Tlemcen": date(2026, 3, 2),
+    }
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import event
+
+from app.db import engine
+
+
+@pytest.fixture
+def checkouts():
+    count = [0]
+
+    def on_checkout(*_):
+        count[0] += 1
+
+    event.listen(engine, "checkout", on_checkout)
+    yield count
+    event.remove(engine, "checkout", on_checkout)
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/conflictdata?page=1&per_page=5",
+        "/conflictdata?countries=algeria,afghanistan",
+        "/conflictdata/algeria",
+        "/conflictdata/algeria/history?weeks=4",
+        "/conflictdata/algeria/riskscore",
+        "/feedback/stats",
+    ],
+)
+def test_authenticated_read_uses_one_connection(client, user_headers, checkouts, path):
+    # The user lookup shares the route's session: two checkouts per request
+    # starve the pool once concurrency reaches its size
+    r = client.get(path, headers=user_headers)
+    assert r.status_code == 200, r.text
+    assert checkouts[0] == 1
@@ -0,0 +1,10 @@
+from __future__ import annotations
+
+
+def test_country_path_does_not_hit_page_cache(client, user_headers):
+    r = client.get("/conflictdata", params={"page": 1, "per_page": 20}, headers=user_headers)
+    assert r.status_code == 200, r.text
+
+    # Used to share the page listing's "conflictdata:1:20" cache key
+    r = client.get("/conflictdata/1:20", headers=user_headers)
+    assert r.status_code == 404, r.text